@@ -0,0 +1,573 @@
+import os
+import sys
+import json
+import atexit
+import time
+import random
+import logging
+import argparse
+import platform
+import statistics
+import subprocess
+import threading
+import tracemalloc
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Render into an offscreen surface so the benchmark runs headless
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PIL import Image, ImageDraw, ImageFont, ImageFilter
+from PyQt5 import QtCore, QtWidgets
+
+import main
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Synthetic end-to-end benchmark: capture -> preprocess -> encode -> translate -> render, through
+# the app's own TranslationPipeline with several captures in flight.
+# Translation goes to a local stub of the chat completions endpoint, so results only
+# measure our own pipeline (plus the simulated backend latency) and are comparable across commits.
+# The stub runs in its own process, so its copies of the request bodies don't show up in our memory numbers.
+
+# Jobs enter the pipeline with their images already set, there is no screen to grab headless,
+# so the capture stage only hands them on and isn't reported (its time counts as queued)
+STAGES = ['preprocess', 'encode', 'translate', 'render']
+
+SAMPLE_TEXTS = {
+    'Latin': "The quick brown fox jumps over the lazy dog. Änderungen gespeichert.",
+    'Cyrillic': "Съешь же ещё этих мягких французских булок, да выпей чаю.",
+    'Greek': "Γαζέες καὶ μυρτιὲς δὲν θὰ βρῶ πιὰ στὸ χρυσαφὶ ξέφωτο.",
+    'Arabic': "نص حكيم له سر قاطع وذو شأن عظيم مكتوب على ثوب أخضر.",
+    'Devanagari': "ऋषियों को सताने वाले दुष्ट राक्षसों के राजा रावण का सर्वनाश करने वाले।",
+    'Han': "设置已保存。请重新启动应用程序以应用更改。",
+    'Japanese': "いろはにほへと ちりぬるを わかよたれそ つねならむ。設定を保存しました。",
+    'Hangul': "다람쥐 헌 쳇바퀴에 타고파. 설정이 저장되었습니다.",
+}
+
+# Fonts tried (in order) for each script; the first one found is used
+FONT_CANDIDATES = {
+    'Latin': ['DejaVuSans.ttf', 'arial.ttf', 'Arial.ttf'],
+    'Cyrillic': ['DejaVuSans.ttf', 'arial.ttf', 'Arial.ttf'],
+    'Greek': ['DejaVuSans.ttf', 'arial.ttf', 'Arial.ttf'],
+    'Arabic': ['NotoSansArabic-Regular.ttf', 'DejaVuSans.ttf', 'arial.ttf'],
+    'Devanagari': ['NotoSansDevanagari-Regular.ttf', 'Nirmala.ttf', 'mangal.ttf'],
+    'Han': ['NotoSansCJK-Regular.ttc', 'msyh.ttc', 'simsun.ttc'],
+    'Japanese': ['NotoSansCJK-Regular.ttc', 'msgothic.ttc', 'YuGothM.ttc'],
+    'Hangul': ['NotoSansCJK-Regular.ttc', 'malgun.ttf'],
+}
+
+FONT_DIRS = [
+    os.path.join(os.environ.get('WINDIR', r'C:\Windows'), 'Fonts'),
+    '/usr/share/fonts',
+    '/usr/local/share/fonts',
+    '/Library/Fonts',
+    '/System/Library/Fonts',
+]
+
+SIZES = {
+    'small': (240, 60),
+    'medium': (640, 200),
+    'large': (1600, 900),
+}
+
+BACKGROUNDS = ['solid', 'gradient', 'photo']
+NOISE_LEVELS = [0.0, 0.05, 0.15]
+
+
+_font_cache = {}
+
+
+def find_font(script, font_dirs):
+    if script not in _font_cache:
+        _font_cache[script] = _search_font(script, font_dirs)
+    return _font_cache[script]
+
+
+def _search_font(script, font_dirs):
+    for name in FONT_CANDIDATES.get(script, []):
+        for font_dir in font_dirs:
+            for root, _, files in os.walk(font_dir):
+                if name in files:
+                    return os.path.join(root, name)
+    return None
+
+
+def make_background(kind, size, rng):
+    width, height = size
+    if kind == 'solid':
+        return Image.new('RGB', size, tuple(rng.randint(200, 255) for _ in range(3)))
+    if kind == 'gradient':
+        start = [rng.randint(150, 255) for _ in range(3)]
+        end = [rng.randint(150, 255) for _ in range(3)]
+        column = Image.new('RGB', (1, height))
+        for y in range(height):
+            t = y / max(height - 1, 1)
+            column.putpixel((0, y), tuple(int(a + (b - a) * t) for a, b in zip(start, end)))
+        return column.resize(size)
+    # 'photo': blurred random blocks, a rough stand-in for busy UI or game backgrounds
+    small = Image.new('RGB', (max(width // 16, 1), max(height // 16, 1)))
+    small.putdata([tuple(rng.randint(120, 255) for _ in range(3)) for _ in range(small.width * small.height)])
+    return small.resize(size).filter(ImageFilter.GaussianBlur(4))
+
+
+def add_noise(image, level, rng):
+    if level <= 0:
+        return image
+    noise = Image.effect_noise(image.size, 64).convert('RGB')
+    image = Image.blend(image, noise, level)
+    # Sprinkle a few random pixels too, so the PNG encoder can't compress them away
+    pixels = image.load()
+    for _ in range(int(image.width * image.height * level * 0.1)):
+        pixels[rng.randrange(image.width), rng.randrange(image.height)] = tuple(rng.randint(0, 255) for _ in range(3))
+    return image
+
+
+def render_sample(script, size_name, background, noise, rng, font_dirs):
+    size = SIZES[size_name]
+    image = make_background(background, size, rng)
+    font_path = find_font(script, font_dirs)
+    font_size = max(size[1] // 6, 12)
+    font = ImageFont.truetype(font_path, font_size) if font_path else ImageFont.load_default()
+
+    # Wrap the sample text into the image width
+    draw = ImageDraw.Draw(image)
+    words = SAMPLE_TEXTS[script].split(' ')
+    lines, line = [], ''
+    for word in words:
+        candidate = f"{line} {word}".strip()
+        if line and draw.textlength(candidate, font=font) > size[0] - 20:
+            lines.append(line)
+            line = word
+        else:
+            line = candidate
+    lines.append(line)
+    draw.multiline_text((10, 10), '\n'.join(lines), font=font, fill=(20, 20, 20))
+
+    return {
+        'id': f"{script}-{size_name}-{background}-{noise}",
+        'script': script,
+        'size': size_name,
+        'background': background,
+        'noise': noise,
+        'font': os.path.basename(font_path) if font_path else 'default',
+        'image': add_noise(image, noise, rng),
+    }
+
+
+def build_corpus(seed, scripts, sizes, font_dirs):
+    # Deterministic for a given seed, so runs on different commits see identical input
+    rng = random.Random(seed)
+    corpus = []
+    for script in scripts:
+        for size_name in sizes:
+            for background in BACKGROUNDS:
+                for noise in NOISE_LEVELS:
+                    corpus.append(render_sample(script, size_name, background, noise, rng, font_dirs))
+    return corpus
+
+
+class StubBackend(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency_ms):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.latency_ms = latency_ms
+        self.request_sizes = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1/chat/completions"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        # The benchmark reads the recorded request sizes back from here after the timed runs
+        with self.server.lock:
+            response = json.dumps({"request_sizes": self.server.request_sizes}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def do_DELETE(self):
+        # Forgets the sizes recorded so far, so warm-up requests aren't counted
+        with self.server.lock:
+            self.server.request_sizes = []
+        self.send_response(204)
+        self.end_headers()
+
+    def do_POST(self):
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            body = self.read_chunked()
+        else:
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        with self.server.lock:
+            self.server.request_sizes.append(len(body))
+        time.sleep(self.server.latency_ms / 1000)
+
+        content = json.dumps({
+            "detected_language": "Stub",
+            "original_text": "stub original text",
+            "english_translation": "stub English translation of the captured text",
+        })
+        response = json.dumps({
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def read_chunked(self):
+        body = bytearray()
+        while True:
+            size = int(self.rfile.readline().strip(), 16)
+            if size == 0:
+                self.rfile.readline()
+                return bytes(body)
+            body += self.rfile.read(size)
+            self.rfile.readline()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_stub(latency_ms):
+    # Entry point of the stub process, the parent reads the URL from the first line of stdout
+    backend = StubBackend(latency_ms)
+    print(backend.url, flush=True)
+    backend.serve_forever()
+
+
+def start_stub(latency_ms):
+    process = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve-stub', '--stub-latency-ms', str(latency_ms)],
+                               stdout=subprocess.PIPE, text=True)
+    # Don't leave the stub behind if the benchmark dies half way
+    atexit.register(process.kill)
+    url = process.stdout.readline().strip()
+    if not url:
+        process.wait()
+        raise RuntimeError(f"Stub backend exited with code {process.returncode}")
+    return process, url
+
+
+def stub_stats_url(url):
+    return url.rsplit('/v1/', 1)[0] + '/stats'
+
+
+def stub_request_sizes(url):
+    response = requests.get(stub_stats_url(url), timeout=10)
+    response.raise_for_status()
+    return response.json()['request_sizes']
+
+
+def reset_stub_request_sizes(url):
+    requests.delete(stub_stats_url(url), timeout=10).raise_for_status()
+
+
+def current_rss():
+    # Resident set size of this process in bytes, None where we have no way to read it
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class RssSampler(threading.Thread):
+    # Polls RSS while a sample runs. Unlike tracemalloc this also sees Pillow's pixel buffers,
+    # zlib state and the Qt backing store, which are allocated outside the Python allocator.
+    def __init__(self, interval=0.001):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.baseline = current_rss()
+        self.peak = self.baseline
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.peak = max(self.peak, current_rss())
+            self.stopped.wait(self.interval)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        self.peak = max(self.peak, current_rss())
+        return self.peak
+
+
+class BenchmarkPipeline(main.TranslationPipeline):
+    # The app's pipeline, with the time each stage spends on a job recorded on the job
+    def __init__(self):
+        super().__init__(lambda: 'benchmark-key')
+
+    def timed(self, stage, work, job):
+        start = time.perf_counter()
+        try:
+            work(job)
+        finally:
+            job.stage_ms[stage] = (time.perf_counter() - start) * 1000
+
+    def preprocess(self, job):
+        self.timed('preprocess', super().preprocess, job)
+
+    def encode(self, job):
+        self.timed('encode', super().encode, job)
+        job.png_bytes = len(job.img_bytes[0])
+
+    def translate(self, job):
+        self.timed('translate', super().translate, job)
+
+
+class PipelineRunner(QtCore.QObject):
+    # Feeds samples into a BenchmarkPipeline with up to in_flight jobs queued at once, and renders
+    # the results on the GUI thread the same way TranslatorApp does
+    def __init__(self, target_language, in_flight):
+        super().__init__()
+        self.target_language = target_language
+        self.in_flight = in_flight
+        self.finished = []
+        self.pipeline = BenchmarkPipeline()
+        self.pipeline.job_captured.connect(self.show_overlay)
+        self.pipeline.job_finished.connect(self.render)
+
+    def show_overlay(self, job):
+        window = main.TranslationDisplayWindow("Translating...", job.rects[0], main.MINIMUM_WINDOW_WIDTH, main.MINIMUM_WINDOW_HEIGHT)
+        window.show()
+        job.windows.append(window)
+
+    def render(self, job):
+        start = time.perf_counter()
+        for window, translation in zip(job.windows, job.translations or []):
+            window.update_text(translation[2])
+            window.viewport().repaint()
+        job.stage_ms['render'] = (time.perf_counter() - start) * 1000
+        job.total_ms = (time.perf_counter() - job.submitted) * 1000
+        for window in job.windows:
+            window.close()
+        self.finished.append(job)
+
+    def run(self, samples):
+        # Returns the finished jobs in completion order
+        self.finished = []
+        pending = list(samples)
+        submitted = 0
+        while len(self.finished) < len(samples):
+            while pending and submitted - len(self.finished) < self.in_flight:
+                sample = pending.pop(0)
+                # Same thing the capture stage hands on after an mss grab
+                job = main.CaptureJob([], self.target_language, [QtCore.QRect(0, 0, *sample['image'].size)],
+                                      images=[sample['image'].copy()])
+                job.sample = sample
+                job.stage_ms = {}
+                job.submitted = time.perf_counter()
+                if not self.pipeline.submit(job, timeout=60):
+                    raise RuntimeError("Pipeline did not accept a job within 60 s")
+                submitted += 1
+            QtWidgets.QApplication.processEvents(QtCore.QEventLoop.WaitForMoreEvents)
+
+        failed = [job for job in self.finished if job.error is not None]
+        if failed:
+            raise RuntimeError(f"{failed[0].sample['id']}: {failed[0].error}")
+        return self.finished
+
+
+def summarize(values):
+    ordered = sorted(values)
+    return {
+        'mean': round(statistics.fmean(ordered), 3),
+        'p50': round(ordered[len(ordered) // 2], 3),
+        'p95': round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)], 3),
+        'max': round(ordered[-1], 3),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def run_benchmark(args):
+    corpus = build_corpus(args.seed, args.scripts, args.sizes, args.font_dirs)
+    stub, stub_url = start_stub(args.stub_latency_ms)
+    main.ENDPOINT_POOL = main.EndpointPool([main.Endpoint('stub', stub_url, main.MODEL_NAME)])
+
+    # Every repeat has to reach the stub, and the race against the offline backend would
+    # measure Tesseract instead of our pipeline
+    main.TRANSLATION_CACHE = main.TranslationCache(0)
+    main.OFFLINE_FALLBACK = False
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    runner = PipelineRunner(args.target_language, args.in_flight)
+
+    # Warm up imports, connection pools and font caches outside the measured runs
+    runner.run(corpus[:args.warmup])
+    reset_stub_request_sizes(stub_url)
+
+    stage_times = {stage: [] for stage in STAGES}
+    queued_times = []
+    samples = []
+    wall_start = time.perf_counter()
+    for _ in range(args.repeat):
+        for job in runner.run(corpus):
+            for stage in STAGES:
+                stage_times[stage].append(job.stage_ms[stage])
+            # Whatever isn't spent inside a stage is spent waiting in a queue or for the GUI thread
+            queued = job.total_ms - sum(job.stage_ms.values())
+            queued_times.append(queued)
+            samples.append({
+                'id': job.sample['id'],
+                'png_bytes': job.png_bytes,
+                'detected_script': job.scripts[0],
+                'total_ms': round(job.total_ms, 3),
+                'queued_ms': round(queued, 3),
+                **{f"{stage}_ms": round(job.stage_ms[stage], 3) for stage in STAGES},
+            })
+    wall_time = time.perf_counter() - wall_start
+    request_sizes = stub_request_sizes(stub_url)
+
+    # Separate passes for memory, one job at a time; the sampler thread and tracemalloc would skew the timings above.
+    # RSS growth is what the whole process needs on top of what it already held before the sample;
+    # the Python heap figure only covers objects allocated through Python's allocator.
+    runner.in_flight = 1
+    rss_growth = {}
+    rss_peak = None
+    if current_rss() is not None:
+        for sample in corpus:
+            sampler = RssSampler()
+            sampler.start()
+            runner.run([sample])
+            peak = sampler.stop()
+            rss_growth[sample['id']] = peak - sampler.baseline
+            rss_peak = max(rss_peak or 0, peak)
+
+    python_heap = {}
+    for sample in corpus:
+        tracemalloc.start()
+        runner.run([sample])
+        python_heap[sample['id']] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    stub.terminate()
+    stub.wait()
+    app.processEvents()
+
+    totals = [sample['total_ms'] for sample in samples]
+    return {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'in_flight': args.in_flight,
+            'stub_latency_ms': args.stub_latency_ms,
+            'target_language': args.target_language,
+            'corpus_size': len(corpus),
+            'fonts': sorted({sample['font'] for sample in corpus}),
+        },
+        'stages': {stage: summarize(stage_times[stage]) for stage in STAGES},
+        'total_ms': summarize(totals),
+        'queued_ms': summarize(queued_times),
+        'throughput_per_s': round(len(samples) / wall_time, 3),
+        'peak_memory_bytes': {
+            'rss': rss_peak,
+            'rss_growth': {
+                'max': max(rss_growth.values()),
+                'mean': int(statistics.fmean(rss_growth.values())),
+            } if rss_growth else None,
+            'python_heap': {
+                'max': max(python_heap.values()),
+                'mean': int(statistics.fmean(python_heap.values())),
+            },
+        },
+        'payload_bytes': {
+            'png': summarize([sample['png_bytes'] for sample in samples]),
+            'request_body': summarize(request_sizes),
+        },
+        'samples': samples,
+    }
+
+
+def memory_figure(results, key):
+    value = results['peak_memory_bytes'].get(key)
+    return value['max'] if isinstance(value, dict) else value
+
+
+def compare(results, baseline):
+    # Prints relative change of the headline numbers against an earlier results file
+    rows = [('total p50 ms', results['total_ms']['p50'], baseline['total_ms']['p50']),
+            ('total p95 ms', results['total_ms']['p95'], baseline['total_ms']['p95']),
+            ('throughput/s', results['throughput_per_s'], baseline['throughput_per_s']),
+            ('request body p50', results['payload_bytes']['request_body']['p50'], baseline['payload_bytes']['request_body']['p50'])]
+    for name, key in [('peak rss', 'rss'), ('python heap max', 'python_heap')]:
+        new, old = memory_figure(results, key), memory_figure(baseline, key)
+        if new is not None and old is not None:
+            rows.append((name, new, old))
+    rows += [(f"{stage} p50 ms", results['stages'][stage]['p50'], baseline['stages'][stage]['p50'])
+             for stage in STAGES if stage in baseline['stages']]
+    print(f"Comparing {results['meta']['revision']} against {baseline['meta']['revision']}")
+    for name, new, old in rows:
+        change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+        print(f"  {name:<20} {old:>14} -> {new:<14} {change}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Vistran end-to-end pipeline benchmark")
+    parser.add_argument('--output', default='bench_results.json', help="Where to write machine-readable results")
+    parser.add_argument('--compare', help="Earlier results file to compare against")
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--repeat', type=int, default=3, help="Times to run through the whole corpus")
+    parser.add_argument('--in-flight', type=int, default=4, help="Captures kept in the pipeline at once")
+    parser.add_argument('--warmup', type=int, default=3, help="Samples to run before measuring")
+    parser.add_argument('--scripts', nargs='+', default=list(SAMPLE_TEXTS), choices=list(SAMPLE_TEXTS))
+    parser.add_argument('--sizes', nargs='+', default=list(SIZES), choices=list(SIZES))
+    parser.add_argument('--stub-latency-ms', type=float, default=0, help="Simulated backend latency per request")
+    parser.add_argument('--target-language', default='Autodetect')
+    parser.add_argument('--serve-stub', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--font-dir', dest='font_dirs', action='append', default=None,
+                        help="Extra directory to search for fonts (repeatable)")
+    args = parser.parse_args()
+    args.font_dirs = (args.font_dirs or []) + FONT_DIRS
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.serve_stub:
+        serve_stub(args.stub_latency_ms)
+        sys.exit()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    results = run_benchmark(args)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+    print(f"Corpus: {results['meta']['corpus_size']} samples x {args.repeat} runs, fonts: {', '.join(results['meta']['fonts'])}")
+    for stage in STAGES:
+        print(f"  {stage:<11} p50 {results['stages'][stage]['p50']:>9.2f} ms   p95 {results['stages'][stage]['p95']:>9.2f} ms")
+    print(f"  queued      p50 {results['queued_ms']['p50']:>9.2f} ms   p95 {results['queued_ms']['p95']:>9.2f} ms")
+    print(f"  total       p50 {results['total_ms']['p50']:>9.2f} ms   p95 {results['total_ms']['p95']:>9.2f} ms")
+    memory = results['peak_memory_bytes']
+    rss = f"peak RSS {memory['rss'] / 1e6:.1f} MB" if memory['rss'] is not None else "RSS unavailable"
+    print(f"  throughput  {results['throughput_per_s']} captures/s, {rss}, Python heap peak {memory['python_heap']['max'] / 1e6:.1f} MB")
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(results, json.load(f))
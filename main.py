@@ -1,7 +1,18 @@
 import sys
 import io
 import os
+import re
 import base64
+import hashlib
+import secrets
+import socketserver
+import time
+import queue
+import threading
+import concurrent.futures
+import cProfile
+import pstats
+import tracemalloc
 import requests
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtWidgets import QApplication, QGraphicsView, QGraphicsScene, QGraphicsBlurEffect, QGraphicsPixmapItem, QGraphicsDropShadowEffect, QTextEdit, QVBoxLayout, QHBoxLayout, QLabel, QFrame, QLineEdit, QGridLayout, QComboBox
@@ -14,6 +25,16 @@ import json
 import keyring
 import keyboard
 
+try:
+    import pytesseract
+except ImportError:
+    pytesseract = None
+
+try:
+    import argostranslate.translate
+except ImportError:
+    argostranslate = None
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -24,14 +45,1033 @@ MINIMUM_WINDOW_WIDTH = 70
 MINIMUM_WINDOW_HEIGHT = 40 
 MAX_RETRIES = 2 # Maximum number of retries for API calls
 
+# OpenAI-compatible endpoints. API_URL/MODEL_NAME above are the default when no endpoints file exists.
+# endpoints.json is a list like:
+#   [{"name": "lan", "url": "http://192.168.1.20:8000/v1/chat/completions", "model": "qwen2-vl", "max_concurrency": 2},
+#    {"name": "openai", "url": "https://api.openai.com/v1/chat/completions", "model": "gpt-4o-mini", "max_concurrency": 4,
+#     "use_default_key": true}]
+# "api_key" (or "api_key_env", the name of an environment variable) is optional; without it no Authorization header is sent.
+# The OpenAI key from Options is only sent to entries with "use_default_key": true (and to the built-in default endpoint),
+# so it never leaks to a LAN or third-party server.
+# "structured_output": false skips the JSON schema response_format for servers that don't support it.
+ENDPOINTS_FILE = os.environ.get('VISTRAN_ENDPOINTS', 'endpoints.json')
+DEFAULT_MAX_CONCURRENCY = 4
+REQUEST_TIMEOUT = 60  # Seconds
+LATENCY_SMOOTHING = 0.3  # Weight of the newest sample in each endpoint's moving average latency
+FAILURE_THRESHOLD = 2  # Consecutive failures before an endpoint is taken out of rotation
+UNHEALTHY_COOLDOWN = 30  # Seconds before an unhealthy endpoint is tried again
+HEALTH_CHECK_INTERVAL = 30  # Seconds between background health checks
+UPLOAD_CHUNK_SIZE = 3 * 64 * 1024  # Raw image bytes base64-encoded per chunk while streaming a request body, keep a multiple of 3
+
+# Speculative capture: when the drag pauses, crop/preprocess/encode the current rectangle from the frozen
+# selection frame in the background, so the work is already done if the user releases there.
+SPECULATIVE_CAPTURE = True
+SPECULATION_DELAY_MS = 250  # How long the mouse has to rest before we speculate
+LIVE_CAPTURE_DELAY_MS = 100  # Without a frozen frame, time for the compositor to take the selection window off screen
+
+# Capture pipeline: capture -> preprocess -> encode -> translate on worker threads, render on the GUI thread.
+# Stages are connected by bounded queues, so a backed-up stage slows the ones before it instead of piling up images.
+PIPELINE_QUEUE_SIZE = 4
+PIPELINE_WORKERS = {
+    "capture": 1,
+    "preprocess": 1,
+    "encode": 2,
+    "translate": 4,  # Network bound, the endpoint pool enforces the real concurrency limits
+}
+
+# On-demand profiling (Ctrl+Alt+P or the Options page). Nothing is traced while it's off.
+PROFILE_DIR = 'profiles'
+PROFILE_SAMPLE_INTERVAL = 0.005  # Seconds between stack samples for the flamegraph
+PROFILE_TRACEMALLOC_FRAMES = 10  # Traceback depth kept per allocation
+PROFILE_TOP_ALLOCATIONS = 50
+
+# Resident daemon: `python main.py --daemon` stays in the background and serves a local socket API
+# (newline-delimited JSON, see vistran_client.py), sharing the pipeline, cache and connections with the hotkey.
+DAEMON_HOST = '127.0.0.1'
+DAEMON_PORT = int(os.environ.get('VISTRAN_PORT', 47291))
+DAEMON_INFO_FILE = os.path.join(os.path.expanduser('~'), '.vistran_daemon.json')  # Port and access token for clients
+DAEMON_REQUEST_TIMEOUT = 120  # Seconds a client waits for its translation
+TRANSLATION_CACHE_SIZE = 128  # Translations kept per image hash and target language
+
+# Offline backend (Tesseract OCR + argostranslate) raced against the API. If the API hasn't answered within
+# the budget, the local result is shown as a provisional overlay and replaced once the API answers;
+# if the API fails, the local result stays.
+OFFLINE_FALLBACK = pytesseract is not None and argostranslate is not None
+LATENCY_BUDGET_MS = 1500
+OFFLINE_WORKERS = 2  # OCR is CPU heavy, keep it from starving the rest of the machine
+
+# Local script pre-detection (Tesseract OSD). Lets Autodetect send a language hint
+# to the API and pick the right traineddata/argostranslate model without loading every one.
+TESSERACT_CMD = os.environ.get('TESSERACT_CMD')  # e.g. C:\Program Files\Tesseract-OCR\tesseract.exe
+SCRIPT_DETECTION_MAX_SIDE = 1024  # Downscale larger captures before OSD, script detection doesn't need full resolution
+SCRIPT_DETECTION_MIN_CONFIDENCE = 1.0
+SCRIPT_DETECTION_TIMEOUT = 2  # Seconds, OSD runs before the API request so it must never hold it up for long
+LATIN_OCR_LANGUAGE = os.environ.get('VISTRAN_LATIN_OCR', 'eng')  # One traineddata covers every Latin-script language well enough
+
+if pytesseract is not None and TESSERACT_CMD:
+    pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+
+# Target language name -> (Tesseract traineddata, argostranslate language code)
+LANGUAGE_CODES = {
+    "Arabic": ("ara", "ar"),
+    "Bengali": ("ben", "bn"),
+    "Chinese (Simplified)": ("chi_sim", "zh"),
+    "Chinese (Traditional)": ("chi_tra", "zt"),
+    "Danish": ("dan", "da"),
+    "Dutch": ("nld", "nl"),
+    "English": ("eng", "en"),
+    "Finnish": ("fin", "fi"),
+    "French": ("fra", "fr"),
+    "German": ("deu", "de"),
+    "Greek": ("ell", "el"),
+    "Hindi": ("hin", "hi"),
+    "Italian": ("ita", "it"),
+    "Japanese": ("jpn", "ja"),
+    "Korean": ("kor", "ko"),
+    "Norwegian": ("nor", "nb"),
+    "Polish": ("pol", "pl"),
+    "Portuguese (Brazilian)": ("por", "pt"),
+    "Portuguese (European)": ("por", "pt"),
+    "Russian": ("rus", "ru"),
+    "Spanish": ("spa", "es"),
+    "Swedish": ("swe", "sv"),
+    "Turkish": ("tur", "tr"),
+}
+
+# Script reported by Tesseract OSD -> candidate target languages
+SCRIPT_LANGUAGES = {
+    "Latin": ["English", "Danish", "Dutch", "Finnish", "French", "German", "Italian", "Norwegian", "Polish",
+              "Portuguese (Brazilian)", "Portuguese (European)", "Spanish", "Swedish", "Turkish"],
+    "Cyrillic": ["Russian"],
+    "Arabic": ["Arabic"],
+    "Devanagari": ["Hindi"],
+    "Bengali": ["Bengali"],
+    "Greek": ["Greek"],
+    "Han": ["Chinese (Simplified)", "Chinese (Traditional)", "Japanese"],
+    "HanS": ["Chinese (Simplified)"],
+    "HanT": ["Chinese (Traditional)"],
+    "Japanese": ["Japanese"],
+    "Hiragana": ["Japanese"],
+    "Katakana": ["Japanese"],
+    "Hangul": ["Korean"],
+    "Korean": ["Korean"],
+}
+
+# Set once Tesseract or osd.traineddata turns out to be missing, so we stop spawning it for every capture
+OSD_UNAVAILABLE = threading.Event()
+
+def detect_script(pil_image):
+    # Returns the dominant script name (e.g. "Cyrillic") or None if it can't be determined cheaply
+    if pytesseract is None or OSD_UNAVAILABLE.is_set():
+        return None
+    try:
+        image = pil_image.convert('L')
+        if max(image.size) > SCRIPT_DETECTION_MAX_SIDE:
+            image.thumbnail((SCRIPT_DETECTION_MAX_SIDE, SCRIPT_DETECTION_MAX_SIDE))
+        osd = pytesseract.image_to_osd(image, config='--psm 0', timeout=SCRIPT_DETECTION_TIMEOUT)
+    except pytesseract.TesseractNotFoundError:
+        logging.warning("Tesseract not found, script detection disabled.")
+        OSD_UNAVAILABLE.set()
+        return None
+    except Exception as e:
+        # OSD raises on images with too few characters, on timeout, or when osd.traineddata is missing
+        if 'traineddata' in str(e) or 'Failed loading language' in str(e):
+            logging.warning(f"Tesseract OSD data unavailable, script detection disabled: {e}")
+            OSD_UNAVAILABLE.set()
+        else:
+            logging.debug(f"Script detection failed: {e}")
+        return None
+
+    match = re.search(r'Script:\s*(\w+)', osd)
+    confidence = re.search(r'Script confidence:\s*([\d.]+)', osd)
+    if not match or (confidence and float(confidence.group(1)) < SCRIPT_DETECTION_MIN_CONFIDENCE):
+        return None
+    logging.info(f"Detected script: {match.group(1)}")
+    return match.group(1)
+
+# Script reported by Tesseract OSD -> the single traineddata used to OCR it.
+# The actual language is narrowed down afterwards from the recognised text.
+SCRIPT_OCR_LANGUAGE = {
+    "Latin": LATIN_OCR_LANGUAGE,
+    "Cyrillic": "rus",
+    "Arabic": "ara",
+    "Devanagari": "hin",
+    "Bengali": "ben",
+    "Greek": "ell",
+    "Han": "chi_sim",
+    "HanS": "chi_sim",
+    "HanT": "chi_tra",
+    "Japanese": "jpn",
+    "Hiragana": "jpn",
+    "Katakana": "jpn",
+    "Hangul": "kor",
+    "Korean": "kor",
+}
+
+def languages_for_script(script):
+    return SCRIPT_LANGUAGES.get(script, [])
+
+def ocr_language(target_language, script=None):
+    # Exactly one traineddata per capture: the chosen language's, else the detected script's
+    if target_language != "Autodetect":
+        return LANGUAGE_CODES.get(target_language, (None, None))[0]
+    return SCRIPT_OCR_LANGUAGE.get(script)
+
+def argos_language_code(language):
+    return LANGUAGE_CODES.get(language, (None, None))[1]
+
+def language_hint_prompt(target_language, script=None):
+    if target_language != "Autodetect":
+        return f"The target language is {target_language}. "
+    candidates = languages_for_script(script)
+    if len(candidates) == 1:
+        return f"The text is most likely {candidates[0]}. "
+    if script:
+        return f"The text appears to be written in the {script} script. "
+    return ""
+
+class Endpoint:
+    def __init__(self, name, url, model, api_key=None, max_concurrency=DEFAULT_MAX_CONCURRENCY, structured_output=True,
+                 use_default_key=False):
+        self.name = name
+        self.url = url
+        self.model = model
+        self.api_key = api_key
+        self.use_default_key = use_default_key  # Fall back to the key from Options when api_key is None
+        self.max_concurrency = max_concurrency
+        self.structured_output = structured_output  # Send a JSON schema as response_format
+        self.in_flight = 0
+        self.latency = None  # Moving average in seconds, None until the first response
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0
+        # One session per endpoint keeps connections alive between captures
+        self.session = requests.Session()
+
+    def is_healthy(self):
+        return time.monotonic() >= self.unhealthy_until
+
+    def has_capacity(self):
+        return self.in_flight < self.max_concurrency
+
+    def score(self):
+        # Expected wait if we queue behind the requests already in flight. Endpoints without
+        # a latency sample score 0 so every endpoint gets measured at least once.
+        return (self.latency or 0) * (self.in_flight + 1) / self.max_concurrency
+
+    def authorization_key(self, default_key):
+        # Key to send as the bearer token, None to send no Authorization header
+        if self.api_key is not None:
+            return self.api_key
+        return default_key if self.use_default_key else None
+
+    def models_url(self):
+        return self.url.rsplit('/chat/completions', 1)[0] + '/models'
+
+    def __repr__(self):
+        return f"Endpoint({self.name}, {self.model})"
+
+class EndpointPool:
+    def __init__(self, endpoints):
+        self.endpoints = endpoints
+        self.condition = threading.Condition()
+        self.health_thread = None
+
+    def __len__(self):
+        return len(self.endpoints)
+
+    def needs_default_key(self):
+        return any(endpoint.api_key is None and endpoint.use_default_key for endpoint in self.endpoints)
+
+    def acquire(self, exclude=()):
+        # Picks the healthy endpoint with the lowest expected latency, waiting for a free slot if all are busy.
+        # Falls back to unhealthy endpoints when nothing else is left, a degraded endpoint beats no endpoint.
+        with self.condition:
+            while True:
+                candidates = [endpoint for endpoint in self.endpoints if endpoint not in exclude]
+                if not candidates:
+                    return None
+                healthy = [endpoint for endpoint in candidates if endpoint.is_healthy()] or candidates
+                available = [endpoint for endpoint in healthy if endpoint.has_capacity()]
+                if available:
+                    endpoint = min(available, key=lambda endpoint: endpoint.score())
+                    endpoint.in_flight += 1
+                    return endpoint
+                # Nobody notifies when a cooldown runs out, so don't sleep past the next one
+                cooldowns = [endpoint.unhealthy_until for endpoint in candidates if not endpoint.is_healthy()]
+                self.condition.wait(max(min(cooldowns) - time.monotonic(), 0) if cooldowns else None)
+
+    def release(self, endpoint):
+        with self.condition:
+            endpoint.in_flight -= 1
+            # Waiters exclude different endpoints, a single notify() can wake one that can't use this slot
+            self.condition.notify_all()
+
+    def record_success(self, endpoint, latency):
+        with self.condition:
+            if endpoint.latency is None:
+                endpoint.latency = latency
+            else:
+                endpoint.latency = LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * endpoint.latency
+            endpoint.consecutive_failures = 0
+            endpoint.unhealthy_until = 0
+            self.condition.notify_all()
+
+    def record_failure(self, endpoint):
+        with self.condition:
+            endpoint.consecutive_failures += 1
+            if endpoint.consecutive_failures >= FAILURE_THRESHOLD:
+                endpoint.unhealthy_until = time.monotonic() + UNHEALTHY_COOLDOWN
+                logging.warning(f"{endpoint} marked unhealthy for {UNHEALTHY_COOLDOWN}s")
+                # Health changes which endpoints waiters may fall back to
+                self.condition.notify_all()
+
+    def start_health_checks(self):
+        if len(self.endpoints) > 1 and self.health_thread is None:
+            self.health_thread = threading.Thread(target=self.run_health_checks, daemon=True)
+            self.health_thread.start()
+
+    def run_health_checks(self):
+        while True:
+            time.sleep(HEALTH_CHECK_INTERVAL)
+            for endpoint in self.endpoints:
+                self.check_health(endpoint)
+
+    def check_health(self, endpoint):
+        # Any non-5xx answer (even 401) means the server is up and reachable
+        headers = {"Authorization": f"Bearer {endpoint.api_key}"} if endpoint.api_key else {}
+        try:
+            start = time.monotonic()
+            response = endpoint.session.get(endpoint.models_url(), headers=headers, timeout=5)
+            healthy = response.status_code < 500
+        except requests.RequestException as e:
+            logging.debug(f"Health check for {endpoint} failed: {e}")
+            healthy = False
+
+        if healthy:
+            with self.condition:
+                if not endpoint.is_healthy():
+                    logging.info(f"{endpoint} is healthy again")
+                endpoint.consecutive_failures = 0
+                endpoint.unhealthy_until = 0
+                if endpoint.latency is None:
+                    endpoint.latency = time.monotonic() - start
+                self.condition.notify_all()
+        else:
+            with self.condition:
+                endpoint.consecutive_failures = max(endpoint.consecutive_failures, FAILURE_THRESHOLD)
+                endpoint.unhealthy_until = time.monotonic() + UNHEALTHY_COOLDOWN
+
+def load_endpoints(path=ENDPOINTS_FILE):
+    default_pool = EndpointPool([Endpoint('default', API_URL, MODEL_NAME, use_default_key=True)])
+    if not os.path.exists(path):
+        return default_pool
+
+    try:
+        with open(path, encoding='utf-8') as f:
+            config = json.load(f)
+        endpoints = []
+        for i, entry in enumerate(config):
+            name = entry.get('name', f"endpoint-{i}")
+            max_concurrency = entry.get('max_concurrency', DEFAULT_MAX_CONCURRENCY)
+            if not isinstance(max_concurrency, int) or max_concurrency < 1:
+                raise ValueError(f"max_concurrency of {name} must be a whole number of at least 1, got {max_concurrency!r}")
+            api_key = entry.get('api_key')
+            if api_key is None and entry.get('api_key_env'):
+                api_key = os.environ.get(entry['api_key_env'])
+                if api_key is None:
+                    logging.warning(f"{entry['api_key_env']} is not set, {name} will be sent no API key")
+            endpoints.append(Endpoint(
+                name,
+                entry.get('url', API_URL),
+                entry.get('model', MODEL_NAME),
+                api_key,
+                max_concurrency,
+                entry.get('structured_output', True),
+                entry.get('use_default_key', False) is True
+            ))
+    except (OSError, ValueError, TypeError, AttributeError) as e:
+        logging.error(f"Could not load endpoints from {path}, using the default endpoint: {e}")
+        return default_pool
+    if not endpoints:
+        logging.error(f"No endpoints in {path}, using the default endpoint")
+        return default_pool
+    logging.info(f"Loaded {len(endpoints)} endpoints from {path}: {endpoints}")
+    return EndpointPool(endpoints)
+
+ENDPOINT_POOL = load_endpoints()
+
+class StreamedRequestBody:
+    # JSON request body that base64-encodes the images chunk by chunk as it is sent, instead of holding
+    # the base64 string, the data: URL and the serialized JSON as full copies in memory.
+    # The payload carries one IMAGE_PLACEHOLDER per image, in the same order as images.
+    IMAGE_PLACEHOLDER = "__VISTRAN_IMAGE_DATA__"
+
+    def __init__(self, payload, images, mime_type="image/png"):
+        parts = json.dumps(payload).split(self.IMAGE_PLACEHOLDER)
+        if len(parts) != len(images) + 1:
+            raise ValueError(f"Payload has {len(parts) - 1} image placeholders for {len(images)} images")
+        self.data_url_prefix = f"data:{mime_type};base64,".encode('ascii')
+        self.parts = [part.encode('utf-8') for part in parts]
+        self.images = [memoryview(image) for image in images]
+
+    def __len__(self):
+        # Known up front, so requests sends a Content-Length header instead of chunked encoding
+        encoded = sum(len(self.data_url_prefix) + 4 * ((len(image) + 2) // 3) for image in self.images)
+        return sum(len(part) for part in self.parts) + encoded
+
+    def __iter__(self):
+        for part, image in zip(self.parts, self.images):
+            yield part + self.data_url_prefix
+            for offset in range(0, len(image), UPLOAD_CHUNK_SIZE):
+                yield base64.b64encode(image[offset:offset + UPLOAD_CHUNK_SIZE])
+        yield self.parts[-1]
+
+class ProfilingSession:
+    # CPU and memory profiling for a window of captures, written to PROFILE_DIR when stopped.
+    # cProfile only sees the thread it's enabled on, so the GUI thread and each pipeline worker get their own
+    # profile; a sampling thread records every thread's stack in collapsed format for flamegraph.pl/speedscope.
+    def __init__(self):
+        self.active = False
+        self.lock = threading.Lock()
+        self.idle = threading.Condition(self.lock)  # Notified when the last run() in flight returns
+        self.running = 0
+        self.profiles = {}
+        self.stacks = {}
+        self.sampler = None
+        self.writer = None
+        self.started_at = None
+        self.start_snapshot = None
+
+    def start(self):
+        if self.active or self.is_writing():
+            return
+        with self.lock:
+            self.profiles = {}
+            self.stacks = {}
+        tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+        self.start_snapshot = tracemalloc.take_snapshot()
+        self.started_at = time.strftime('%Y%m%d-%H%M%S')
+        self.active = True
+        self.enable_current_thread()
+        self.sampler = threading.Thread(target=self.sample_stacks, name="profiling-sampler", daemon=True)
+        self.sampler.start()
+        logging.info("Profiling started.")
+
+    def stop(self, on_written=None):
+        # Stops collecting and writes the reports on a background thread, once the pipeline stages
+        # have finished the jobs they are profiling. on_written(output_dir) is called from that thread.
+        if not self.active:
+            return
+        with self.lock:
+            self.active = False
+        # cProfile has to be disabled from the thread that enabled it
+        self.profile_for_current_thread().disable()
+        self.writer = threading.Thread(target=self.write_reports, args=(on_written,), name="profiling-writer", daemon=True)
+        self.writer.start()
+
+    def is_writing(self):
+        return self.writer is not None and self.writer.is_alive()
+
+    def write_reports(self, on_written):
+        self.sampler.join()
+        with self.idle:
+            self.idle.wait_for(lambda: self.running == 0)
+        end_snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        output_dir = os.path.join(PROFILE_DIR, self.started_at)
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+            self.write_cpu_report(output_dir)
+            self.write_memory_report(output_dir, end_snapshot)
+            logging.info(f"Profiling stopped, reports written to {output_dir}")
+        except Exception:
+            logging.exception("Failed to write profiling reports.")
+            output_dir = None
+        finally:
+            self.start_snapshot = None
+        if on_written is not None:
+            on_written(output_dir)
+
+    def profile_for_current_thread(self):
+        name = threading.current_thread().name
+        with self.lock:
+            if name not in self.profiles:
+                self.profiles[name] = cProfile.Profile()
+            return self.profiles[name]
+
+    def enable_current_thread(self):
+        try:
+            self.profile_for_current_thread().enable()
+        except ValueError as e:
+            # Python 3.12+ allows a single active cProfile at a time; the stack sampler still covers this thread
+            logging.debug(f"cProfile unavailable on {threading.current_thread().name}: {e}")
+
+    def run(self, work, *args):
+        # Runs work(*args) under this thread's profile, unprofiled if the session has stopped meanwhile
+        with self.lock:
+            if not self.active:
+                profile = None
+            else:
+                name = threading.current_thread().name
+                if name not in self.profiles:
+                    self.profiles[name] = cProfile.Profile()
+                profile = self.profiles[name]
+                self.running += 1
+        if profile is None:
+            return work(*args)
+        try:
+            try:
+                profile.enable()
+            except ValueError:
+                return work(*args)
+            try:
+                return work(*args)
+            finally:
+                profile.disable()
+        finally:
+            with self.idle:
+                self.running -= 1
+                self.idle.notify_all()
+
+    def sample_stacks(self):
+        sampler_id = threading.get_ident()
+        while self.active:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == sampler_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                key = ';'.join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+            time.sleep(PROFILE_SAMPLE_INTERVAL)
+
+    def write_cpu_report(self, output_dir):
+        with open(os.path.join(output_dir, 'stacks.folded'), 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+        with self.lock:
+            profiles = list(self.profiles.values())
+        stats = None
+        for profile in profiles:
+            try:
+                stats = pstats.Stats(profile) if stats is None else stats.add(profile)
+            except TypeError:
+                pass  # Profile that never ran anything
+        if stats is None:
+            return
+        stats.dump_stats(os.path.join(output_dir, 'cpu.prof'))
+        with open(os.path.join(output_dir, 'cpu.txt'), 'w', encoding='utf-8') as f:
+            stats.stream = f
+            stats.sort_stats('cumulative').print_stats(PROFILE_TOP_ALLOCATIONS)
+
+    def write_memory_report(self, output_dir, end_snapshot):
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        end_snapshot = end_snapshot.filter_traces(filters)
+        with open(os.path.join(output_dir, 'memory.txt'), 'w', encoding='utf-8') as f:
+            f.write(f"Top {PROFILE_TOP_ALLOCATIONS} allocations still alive at the end, by line:\n")
+            for stat in end_snapshot.statistics('lineno')[:PROFILE_TOP_ALLOCATIONS]:
+                f.write(f"  {stat}\n")
+
+            f.write("\nGrowth since profiling started, by line:\n")
+            for stat in end_snapshot.compare_to(self.start_snapshot.filter_traces(filters), 'lineno')[:PROFILE_TOP_ALLOCATIONS]:
+                f.write(f"  {stat}\n")
+
+            f.write("\nLargest allocation sites with tracebacks:\n")
+            for stat in end_snapshot.statistics('traceback')[:10]:
+                f.write(f"\n{stat.count} blocks, {stat.size / 1024:.1f} KiB\n")
+                for line in stat.traceback.format():
+                    f.write(f"  {line}\n")
+
+PROFILER = ProfilingSession()
+
+class TranslationCache:
+    # Small LRU of finished translations, keyed by image content and target language
+    def __init__(self, size=TRANSLATION_CACHE_SIZE):
+        self.size = size
+        self.entries = {}  # dicts keep insertion order, re-inserting moves an entry to the end
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(image_bytes, target_language):
+        return hashlib.sha256(image_bytes).hexdigest(), target_language
+
+    def get(self, image_bytes, target_language):
+        key = self.key(image_bytes, target_language)
+        with self.lock:
+            translation = self.entries.pop(key, None)
+            if translation is not None:
+                self.entries[key] = translation
+        STATS.increment('cache_hits' if translation is not None else 'cache_misses')
+        return translation
+
+    def put(self, image_bytes, target_language, translation):
+        key = self.key(image_bytes, target_language)
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = translation
+            while len(self.entries) > self.size:
+                del self.entries[next(iter(self.entries))]
+
+class PipelineStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.counters = {}
+        self.stage_times = {}  # stage -> [jobs, total seconds]
+
+    def increment(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_stage(self, stage, seconds):
+        with self.lock:
+            entry = self.stage_times.setdefault(stage, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def snapshot(self):
+        with self.lock:
+            stats = {
+                "uptime_s": round(time.time() - self.started, 1),
+                "counters": dict(self.counters),
+                "stages": {stage: {"jobs": jobs, "mean_ms": round(total / jobs * 1000, 2)}
+                           for stage, (jobs, total) in self.stage_times.items()},
+            }
+        stats["endpoints"] = [{
+            "name": endpoint.name,
+            "model": endpoint.model,
+            "healthy": endpoint.is_healthy(),
+            "in_flight": endpoint.in_flight,
+            "latency_ms": round(endpoint.latency * 1000, 1) if endpoint.latency is not None else None,
+        } for endpoint in ENDPOINT_POOL.endpoints]
+        stats["cache_entries"] = len(TRANSLATION_CACHE.entries)
+        return stats
+
+STATS = PipelineStats()
+TRANSLATION_CACHE = TranslationCache()
+
+def selection_monitor(rect):
+    # Region to grab for a selection, enforcing the minimum overlay size
+    return {
+        "left": rect.left(),
+        "top": rect.top(),
+        "width": max(rect.width(), MINIMUM_WINDOW_WIDTH),
+        "height": max(rect.height(), MINIMUM_WINDOW_HEIGHT)
+    }
+
+def monitor_contains(outer, inner):
+    return (outer["left"] <= inner["left"] and outer["top"] <= inner["top"] and
+            inner["left"] + inner["width"] <= outer["left"] + outer["width"] and
+            inner["top"] + inner["height"] <= outer["top"] + outer["height"])
+
+# A few very common words per Latin-script language, enough to tell them apart on a screenful of text
+STOPWORDS = {
+    "Danish": {"og", "at", "det", "er", "ikke", "jeg", "til", "på", "med", "af", "en"},
+    "Dutch": {"de", "het", "een", "en", "van", "niet", "is", "dat", "op", "te", "zijn"},
+    "English": {"the", "and", "is", "you", "to", "of", "in", "it", "that", "not", "with", "do", "i", "for", "are"},
+    "Finnish": {"ja", "on", "ei", "se", "että", "oli", "hän", "mutta", "kun", "tai", "ole"},
+    "French": {"le", "la", "les", "et", "est", "un", "une", "des", "pas", "que", "vous"},
+    "German": {"der", "die", "das", "und", "ist", "nicht", "ein", "eine", "zu", "mit", "sie"},
+    "Italian": {"il", "di", "che", "è", "non", "la", "per", "un", "una", "sono", "gli"},
+    "Norwegian": {"og", "er", "ikke", "det", "jeg", "til", "på", "som", "en", "av", "har"},
+    "Polish": {"i", "nie", "się", "w", "na", "jest", "to", "że", "z", "do", "jak"},
+    "Portuguese (Brazilian)": {"o", "a", "de", "que", "não", "é", "um", "uma", "os", "você", "para"},
+    "Portuguese (European)": {"o", "a", "de", "que", "não", "é", "um", "uma", "os", "para", "está"},
+    "Spanish": {"el", "la", "de", "que", "y", "en", "los", "es", "no", "un", "por"},
+    "Swedish": {"och", "att", "det", "är", "inte", "jag", "som", "på", "en", "för", "med"},
+    "Turkish": {"ve", "bir", "bu", "da", "de", "için", "değil", "ne", "çok", "ile", "mi"},
+}
+
+MIN_STOPWORD_MATCHES = 2  # Fewer distinct stopwords than this is too little evidence to pick a language
+MIN_STOPWORD_MARGIN = 2  # How many more stopwords the best language needs than the runner-up
+
+def guess_language(text, candidates):
+    # Narrows the candidates for a script down to one language using the OCR'd text,
+    # returns None when the text doesn't point at any of them
+    if len(candidates) == 1:
+        return candidates[0]
+    if "Japanese" in candidates and re.search(r'[\u3040-\u30ff]', text):
+        return "Japanese"
+    words = set(re.findall(r'\w+', text.lower()))
+    scores = {language: len(words & STOPWORDS.get(language, set())) for language in candidates}
+    best = max(candidates, key=lambda language: scores[language])
+    # Languages sharing best's argos model (the Portuguese variants) translate the same way, they don't compete
+    runner_up = max((scores[language] for language in candidates
+                     if argos_language_code(language) != argos_language_code(best)), default=0)
+    if scores[best] < MIN_STOPWORD_MATCHES or scores[best] - runner_up < MIN_STOPWORD_MARGIN:
+        return None
+    return best
+
+def translate_image_locally(image_bytes, target_language="Autodetect", script=None):
+    # Tesseract OCR + argostranslate. Only loads the models for the known or detected language,
+    # returns None when that can't be narrowed down or the models aren't installed.
+    if not OFFLINE_FALLBACK:
+        return None
+    candidates = [target_language] if target_language != "Autodetect" else languages_for_script(script)
+    lang = ocr_language(target_language, script)
+    if not candidates or not lang:
+        return None
+
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+        text = pytesseract.image_to_string(image, lang=lang, config='--psm 6').strip()
+    except Exception as e:
+        logging.warning(f"Local OCR failed: {e}")
+        return None
+    if not text:
+        return "Unable to detect", "-Unable to extract-", "-Unable to translate-"
+
+    language = guess_language(text, candidates)
+    if language is None:
+        logging.info("Couldn't tell the language of the OCR'd text, skipping the offline translation.")
+        return None
+    if language == "English":
+        # Already what the user wants to read, argostranslate has no en->en model anyway
+        return language, text, text
+    try:
+        translated_text = argostranslate.translate.translate(text, argos_language_code(language), "en")
+    except Exception as e:
+        logging.warning(f"Local translation from {language} failed: {e}")
+        return None
+    logging.info(f"Local translation finished ({language}).")
+    return language, text, translated_text
+
+def encode_image(pil_image):
+    # Convert PIL Image to PNG bytes
+    img_byte_arr = io.BytesIO()
+    pil_image.save(img_byte_arr, format='PNG')
+    return img_byte_arr.getvalue()
+
+SYSTEM_PROMPT = "You are a helpful translation assistant."
+
+# Instructions are kept identical between requests and come before anything capture-specific.
+# Note that this alone doesn't get them served from a prompt cache: OpenAI only caches prefixes of
+# at least 1024 tokens, and the system prompt plus these instructions come to roughly 200.
+TRANSLATION_PROMPT = """
+Please extract any text from the image, detect its language, and translate it into English.
+Provide your response in the following JSON format:
+{
+    "detected_language": "The detected language",
+    "original_text": "The original text in the detected language",
+    "english_translation": "The English translation"
+}
+If there is no text in the image, or you are unable to translate it,
+please respond with:
+{
+    "detected_language": "Unable to detect",
+    "original_text": "-Unable to extract-",
+    "english_translation": "-Unable to translate-"
+}
+"""
+
+BATCH_TRANSLATION_PROMPT = """
+Each of the following images is a separate region of the screen, introduced by its region number.
+For every region, extract any text from the image, detect its language, and translate it into English.
+Provide your response in the following JSON format, with one entry per region in the same order:
+{
+    "regions": [
+        {
+            "region": 1,
+            "detected_language": "The detected language",
+            "original_text": "The original text in the detected language",
+            "english_translation": "The English translation"
+        }
+    ]
+}
+If a region has no text, or you are unable to translate it, use "Unable to detect",
+"-Unable to extract-" and "-Unable to translate-" for that region.
+"""
+
+TRANSLATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "detected_language": {"type": "string"},
+        "original_text": {"type": "string"},
+        "english_translation": {"type": "string"}
+    },
+    "required": ["detected_language", "original_text", "english_translation"],
+    "additionalProperties": False
+}
+
+BATCH_TRANSLATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "regions": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"region": {"type": "integer"}, **TRANSLATION_SCHEMA["properties"]},
+                "required": ["region"] + TRANSLATION_SCHEMA["required"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["regions"],
+    "additionalProperties": False
+}
+
+# Output budget: start small, and when a response is cut off (finish_reason "length") resend with a
+# bigger budget instead of retrying the same request. Truncated JSON can't be parsed anyway.
+MAX_TOKENS_PER_REGION = 300
+MAX_OUTPUT_TOKENS = 4096
+
+def image_content():
+    return {
+        "type": "image_url",
+        "image_url": {
+            "url": StreamedRequestBody.IMAGE_PLACEHOLDER
+        }
+    }
+
+def is_api_error(translation):
+    return all(field.startswith("API") for field in translation)
+
+# Placeholder for a batch region the model left out of its answer. Counts as failed, so it's never cached.
+MISSING_REGION_TRANSLATION = ("Missing from the API response", "-Unable to extract-", "-Unable to translate-")
+
+def is_failed_translation(translation):
+    return is_api_error(translation) or translation[0] in ("All API call attempts failed", "No API key provided",
+                                                           MISSING_REGION_TRANSLATION[0])
+
+def is_retryable(translation):
+    # Only network errors, rate limits and server errors can go differently on another attempt (or endpoint).
+    # Bad requests, auth errors and unparseable answers would just fail again at the same cost.
+    error = translation[0]
+    if error.startswith("API call error"):
+        return True
+    match = re.match(r'API error: (\d+)', error)
+    return match is not None and (int(match.group(1)) == 429 or int(match.group(1)) >= 500)
+
+def run_with_failover(call):
+    # Calls call(endpoint) until it returns something that isn't an API error.
+    # Every endpoint gets a chance before we give up, retries prefer endpoints not tried yet.
+    attempts = max(MAX_RETRIES, len(ENDPOINT_POOL))
+    tried = []
+    for attempt in range(attempts):
+        endpoint = ENDPOINT_POOL.acquire(exclude=tried) or ENDPOINT_POOL.acquire()
+        tried.append(endpoint)
+        try:
+            result = call(endpoint)
+        finally:
+            ENDPOINT_POOL.release(endpoint)
+        translation = result if isinstance(result, tuple) else result[0]
+        if not is_api_error(translation):
+            return result
+        if not is_retryable(translation):
+            logging.error(f"API call to {endpoint} failed with a non-retryable error: {translation[0]}")
+            STATS.increment('non_retryable_errors')
+            return result
+        logging.warning(f"API call to {endpoint} failed. Attempt {attempt + 1} of {attempts}")
+        STATS.increment('retries')
+    logging.error("All API call attempts failed")
+    return None
+
+def translate_image(image_bytes, api_key, target_language="Autodetect", script=None):
+    logging.info("Using online translation (OpenAI API).")
+    result = run_with_failover(lambda endpoint: call_openai_api(image_bytes, api_key, target_language, script, endpoint))
+    if result is None:
+        return "All API call attempts failed", "All API call attempts failed", "All API call attempts failed"
+    return result
+
+def translate_images(images, api_key, target_language="Autodetect", scripts=None):
+    # Batch mode: all regions in one request, returns one (language, original, translation) per image
+    logging.info(f"Using online translation (OpenAI API) for a batch of {len(images)} regions.")
+    scripts = scripts or [None] * len(images)
+    result = run_with_failover(lambda endpoint: call_openai_api_batch(images, api_key, target_language, scripts, endpoint))
+    if result is None:
+        return [("All API call attempts failed", "All API call attempts failed", "All API call attempts failed")] * len(images)
+    return result
+
+def post_chat_completion(endpoint, api_key, payload, images):
+    headers = {"Content-Type": "application/json"}
+    key = endpoint.authorization_key(api_key)
+    if key:
+        headers["Authorization"] = f"Bearer {key}"
+
+    logging.info(f"Sending request to {endpoint}.")
+    start = time.monotonic()
+    try:
+        # The images are base64-encoded into the connection as the body is sent
+        body = StreamedRequestBody(payload, images)
+        response = endpoint.session.post(endpoint.url, headers=headers, data=body, timeout=REQUEST_TIMEOUT)
+    except requests.RequestException:
+        ENDPOINT_POOL.record_failure(endpoint)
+        raise
+    if response.status_code == 429 or response.status_code >= 500:
+        ENDPOINT_POOL.record_failure(endpoint)
+    else:
+        ENDPOINT_POOL.record_success(endpoint, time.monotonic() - start)
+    return response
+
+def parse_response_content(result):
+    # Extract the content from the API response
+    content = result['choices'][0]['message']['content']
+
+    # Remove Markdown code block formatting if present (only needed without structured outputs)
+    content = content.strip('`')
+    if content.startswith('json\n'):
+        content = content[5:]  # Remove 'json\n'
+
+    # Parse the content as JSON
+    return content, json.loads(content)
+
+def request_translation_json(endpoint, api_key, messages, images, schema_name, schema, max_tokens):
+    # Sends the request and returns the parsed JSON answer, or an "API ..." error string.
+    # Handles truncation by growing the output budget, and endpoints that don't support structured outputs.
+    while True:
+        payload = {
+            "model": endpoint.model,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": messages}
+            ],
+            "max_tokens": max_tokens
+        }
+        if endpoint.structured_output:
+            payload["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": schema_name, "strict": True, "schema": schema}
+            }
+
+        response = post_chat_completion(endpoint, api_key, payload, images)
+        if response.status_code == 400 and endpoint.structured_output and 'response_format' in response.text:
+            # Some OpenAI-compatible servers reject json_schema; fall back to prompt-only JSON for this endpoint
+            logging.warning(f"{endpoint} doesn't support structured outputs, falling back to plain JSON.")
+            STATS.increment('structured_output_unsupported')
+            endpoint.structured_output = False
+            continue
+        if response.status_code != 200:
+            logging.error(f"API Error: {response.status_code}, {response.text}")
+            return f"API error: {response.status_code}"
+
+        result = response.json()
+
+        # Log the raw API response for debugging
+        logging.debug(f"Raw API response: {result}")
+
+        try:
+            choice = result['choices'][0]
+            finish_reason = choice.get('finish_reason')
+            if choice['message'].get('refusal'):
+                logging.error(f"API refused the request: {choice['message']['refusal']}")
+                STATS.increment('refusals')
+                return "API refusal"
+        except (KeyError, IndexError, TypeError) as e:
+            logging.error(f"Unexpected API response structure: {e}")
+            logging.error(f"Response content: {result}")
+            STATS.increment('structure_errors')
+            return "API structure error"
+
+        if finish_reason == 'length':
+            STATS.increment('truncated_responses')
+            if max_tokens >= MAX_OUTPUT_TOKENS:
+                logging.error(f"API response truncated even with {max_tokens} output tokens.")
+                return "API truncated response"
+            max_tokens = min(max_tokens * 2, MAX_OUTPUT_TOKENS)
+            logging.warning(f"API response truncated, resending with max_tokens={max_tokens}.")
+            continue
+
+        content = None
+        try:
+            content, translation_data = parse_response_content(result)
+            logging.info("Received successful response from OpenAI API.")
+            return translation_data
+        except (json.JSONDecodeError, AttributeError) as e:
+            logging.error(f"Failed to parse API response as JSON: {e}")
+            logging.error(f"Response content: {content}")
+            STATS.increment('parse_failures')
+            return "API parsing error"
+        except (KeyError, IndexError, TypeError) as e:
+            logging.error(f"Unexpected API response structure: {e}")
+            logging.error(f"Response content: {result}")
+            STATS.increment('structure_errors')
+            return "API structure error"
+
+def call_openai_api(image_bytes, api_key, target_language="Autodetect", script=None, endpoint=None):
+    endpoint = endpoint or ENDPOINT_POOL.endpoints[0]
+    try:
+        # Prepare the messages with image and target language
+        messages = [{"type": "text", "text": TRANSLATION_PROMPT}]
+        target_language_prompt = language_hint_prompt(target_language, script)
+        if target_language_prompt:
+            messages.append({"type": "text", "text": target_language_prompt})
+        messages.append(image_content())
+
+        translation_data = request_translation_json(endpoint, api_key, messages, [image_bytes], "translation",
+                                                    TRANSLATION_SCHEMA, MAX_TOKENS_PER_REGION)
+        if isinstance(translation_data, str):
+            return translation_data, translation_data, translation_data
+        if not isinstance(translation_data, dict):
+            STATS.increment('structure_errors')
+            return "API structure error", "API structure error", "API structure error"
+        return (
+            translation_data.get('detected_language', 'Unable to detect'),
+            translation_data.get('original_text', '-Unable to extract-'),
+            translation_data.get('english_translation', '-Unable to translate-')
+        )
+    except Exception as e:
+        logging.exception("Exception occurred during API call.")
+        return f"API call error: {str(e)}", f"API call error: {str(e)}", f"API call error: {str(e)}"
+
+def call_openai_api_batch(images, api_key, target_language="Autodetect", scripts=None, endpoint=None):
+    endpoint = endpoint or ENDPOINT_POOL.endpoints[0]
+    scripts = scripts or [None] * len(images)
+    try:
+        # Shared instructions first, then each region's label, language hint and image
+        messages = [{"type": "text", "text": BATCH_TRANSLATION_PROMPT}]
+        for i, script in enumerate(scripts):
+            messages.append({"type": "text", "text": f"Region {i + 1}. {language_hint_prompt(target_language, script)}".strip()})
+            messages.append(image_content())
+
+        translation_data = request_translation_json(endpoint, api_key, messages, images, "batch_translation",
+                                                    BATCH_TRANSLATION_SCHEMA, MAX_TOKENS_PER_REGION * len(images))
+        if isinstance(translation_data, str):
+            return [(translation_data,) * 3] * len(images)
+        regions = translation_data.get('regions') if isinstance(translation_data, dict) else None
+        if not isinstance(regions, list):
+            logging.error(f"Unexpected API response structure: {translation_data}")
+            STATS.increment('structure_errors')
+            return [("API structure error", "API structure error", "API structure error")] * len(images)
+        logging.info(f"Received successful batch response from OpenAI API ({len(regions)} regions).")
+
+        # Map results back by region number, falling back to position when the model omits it
+        translations = [MISSING_REGION_TRANSLATION] * len(images)
+        for position, region in enumerate(regions):
+            if not isinstance(region, dict):
+                continue
+            index = region.get('region', position + 1)
+            index = index - 1 if isinstance(index, int) and 1 <= index <= len(images) else position
+            if index < len(images):
+                translations[index] = (
+                    region.get('detected_language', 'Unable to detect'),
+                    region.get('original_text', '-Unable to extract-'),
+                    region.get('english_translation', '-Unable to translate-')
+                )
+        return translations
+    except Exception as e:
+        logging.exception("Exception occurred during API call.")
+        return [(f"API call error: {str(e)}",) * 3] * len(images)
+
 class SelectionWindow(QtWidgets.QWidget):
     selection_made = QtCore.pyqtSignal(QtCore.QRect)
     selection_cancelled = QtCore.pyqtSignal()  # New signal for cancellation
+    selection_paused = QtCore.pyqtSignal(QtCore.QRect)  # Drag rested for SPECULATION_DELAY_MS
+    selections_made = QtCore.pyqtSignal(list)  # Batch mode: all regions, sent when the user presses Enter
 
-    def __init__(self):
+    def __init__(self, batch=False, frame=None):
         super().__init__()
+        self.batch = batch
+        self.frame = frame  # ScreenFrame shown frozen underneath the selection, None to select on the live screen
         self.setWindowTitle('Select Region')
-        self.setWindowOpacity(0.3)
+        if self.frame is None:
+            self.setWindowOpacity(0.3)
         self.setWindowFlags(
             QtCore.Qt.WindowStaysOnTopHint |
             QtCore.Qt.FramelessWindowHint |
@@ -42,8 +1082,20 @@ class SelectionWindow(QtWidgets.QWidget):
         self.origin = QtCore.QPoint()
         self.rubberBand = QtWidgets.QRubberBand(QtWidgets.QRubberBand.Rectangle, self)
 
+        # Batch mode keeps every finished region on screen until Enter is pressed
+        self.selections = []
+        self.selection_bands = []
+
+        # Fires once the drag stops moving for a moment
+        self.pause_timer = QTimer(self)
+        self.pause_timer.setSingleShot(True)
+        self.pause_timer.setInterval(SPECULATION_DELAY_MS)
+        self.pause_timer.timeout.connect(self.on_drag_paused)
+
         # Add instruction label
         self.instruction_label = QtWidgets.QLabel("Click and drag to select an area", self)
+        if self.batch:
+            self.instruction_label.setText("Click and drag to add areas, press Enter to translate them all")
         self.instruction_label.setStyleSheet("""
             color: black; 
             background-color: rgba(255, 255, 255, 150);
@@ -52,6 +1104,15 @@ class SelectionWindow(QtWidgets.QWidget):
         """)
         self.instruction_label.move(10, 10)
 
+    def paintEvent(self, event):
+        if self.frame is None:
+            return super().paintEvent(event)
+        # The frozen screen, dimmed the way the translucent window dims the live one
+        painter = QPainter(self)
+        painter.drawImage(QtCore.QPoint(self.frame.left, self.frame.top) - self.mapToGlobal(QtCore.QPoint(0, 0)), self.frame.qimage)
+        painter.fillRect(self.rect(), QColor(0, 0, 0, 80))
+        painter.end()
+
     def mousePressEvent(self, event):
         if event.button() == QtCore.Qt.LeftButton:
             self.origin = event.pos()
@@ -63,19 +1124,45 @@ class SelectionWindow(QtWidgets.QWidget):
     def mouseMoveEvent(self, event):
         if self.rubberBand.isVisible():
             self.rubberBand.setGeometry(QtCore.QRect(self.origin, event.pos()).normalized())
+            if SPECULATIVE_CAPTURE and not self.batch:
+                self.pause_timer.start()
+
+    def on_drag_paused(self):
+        if self.rubberBand.isVisible():
+            self.selection_paused.emit(self.rubberBand.geometry())
 
     def mouseReleaseEvent(self, event):
         if event.button() == QtCore.Qt.LeftButton and self.rubberBand.isVisible():
+            self.pause_timer.stop()
             self.rubberBand.hide()
             selected_rect = QtCore.QRect(self.origin, event.pos()).normalized()
+            if self.batch:
+                self.add_selection(selected_rect)
+                return
             self.selection_made.emit(selected_rect)
             self.close()
 
+    def add_selection(self, rect):
+        band = QtWidgets.QRubberBand(QtWidgets.QRubberBand.Rectangle, self)
+        band.setGeometry(rect)
+        band.show()
+        self.selections.append(rect)
+        self.selection_bands.append(band)
+        self.instruction_label.setText(f"{len(self.selections)} area(s) selected, press Enter to translate them all")
+        self.instruction_label.adjustSize()
+
     def keyPressEvent(self, event):
         if event.key() == QtCore.Qt.Key_Escape:
             self.cancel_selection()
+        elif event.key() in (QtCore.Qt.Key_Return, QtCore.Qt.Key_Enter) and self.batch and self.selections:
+            # Hide the outlines so they don't end up in the captures
+            for band in self.selection_bands:
+                band.hide()
+            self.selections_made.emit(list(self.selections))
+            self.close()
 
     def cancel_selection(self):
+        self.pause_timer.stop()
         self.selection_cancelled.emit()
         self.close()
 
@@ -235,39 +1322,390 @@ class TranslationDisplayWindow(QGraphicsView):
         height = max(rect.height(), minimum_size)
         return QtCore.QRect(rect.x(), rect.y(), width, height)
 
-class TranslationTask(QtCore.QRunnable):
-    def __init__(self, img_bytes, translation_window, app_instance):
+class ScreenFrame:
+    # One grab of the whole virtual screen, taken before the selection window opens. The selection window
+    # shows it frozen and every region of that selection session is cropped from it, so what the user
+    # sees while dragging is exactly what gets translated, speculated or not.
+    def __init__(self):
+        with mss.mss() as sct:
+            screenshot = sct.grab(sct.monitors[0])
+        self.left = screenshot.left
+        self.top = screenshot.top
+        self.size = screenshot.size
+        self.bgra = screenshot.bgra
+        # Wraps self.bgra without copying, for the selection window to paint
+        self.qimage = QtGui.QImage(self.bgra, self.size.width, self.size.height, self.size.width * 4, QtGui.QImage.Format_RGB32)
+        self.image = None
+        self.lock = threading.Lock()
+
+    def crop(self, monitor):
+        # The BGRA to RGB conversion happens once, on whichever worker thread crops first
+        with self.lock:
+            if self.image is None:
+                self.image = Image.frombytes("RGB", self.size, self.bgra, "raw", "BGRX")
+        left = monitor["left"] - self.left
+        top = monitor["top"] - self.top
+        return self.image.crop((left, top, left + monitor["width"], top + monitor["height"]))
+
+class ScreenGrabTask(QtCore.QRunnable):
+    # Grabs a ScreenFrame off the GUI thread and hands it (or None on failure) to grabbed
+    def __init__(self, grabbed):
+        super().__init__()
+        self.grabbed = grabbed
+
+    def run(self):
+        try:
+            frame = ScreenFrame()
+        except Exception:
+            logging.exception("Could not grab the screen, selecting on the live screen instead.")
+            frame = None
+        self.grabbed.emit(frame)
+
+class SpeculativeCapture:
+    def __init__(self, monitor, detect_language, frame):
+        self.monitor = monitor
+        self.detect_language = detect_language
+        self.frame = frame  # ScreenFrame the pixels are cropped from
+        self.done = threading.Event()  # img_bytes and script are available
+        self.cancelled = False
+        self.img_bytes = None
+        self.script = None
+
+class SpeculativeTask(QtCore.QRunnable):
+    def __init__(self, speculation):
         super().__init__()
-        self.img_bytes = img_bytes
-        self.translation_window = translation_window
-        self.app_instance = app_instance
+        self.speculation = speculation
 
     def run(self):
-        # Perform the translation in the background
-        detected_language, original_text, translated_text = self.app_instance.perform_translation(self.img_bytes)
-        if detected_language and original_text and translated_text:
-            logging.info("Translation successful.")
-            # Emit the signal with detected language, original text, and translated text
-            self.app_instance.translation_ready.emit(detected_language, original_text, translated_text)
+        speculation = self.speculation
+        try:
+            image = speculation.frame.crop(speculation.monitor)
+            if speculation.cancelled:
+                return
+            if speculation.detect_language:
+                speculation.script = detect_script(image)
+            if speculation.cancelled:
+                return
+            speculation.img_bytes = encode_image(image)
+            logging.info(f"Speculative capture ready: {speculation.monitor}")
+        except Exception:
+            logging.exception("Speculative capture failed.")
+        finally:
+            speculation.done.set()
+
+class CaptureJob:
+    # One capture travelling through the pipeline. Holds one region, or several in batch mode.
+    # Each stage skips work whose output is already present, so jobs can enter with images or bytes.
+    def __init__(self, monitors, target_language, rects=None, images=None, speculation=None, interactive=True, frame=None):
+        self.monitors = monitors
+        self.rects = rects or []  # Overlay geometry, one per region
+        self.target_language = target_language
+        self.images = images  # PIL images, filled in by the capture stage
+        self.frame = frame  # ScreenFrame the regions are cropped from instead of grabbing the live screen
+        self.speculation = speculation  # SpeculativeCapture from the same frame, equal to or overlapping this selection
+        self.scripts = None
+        self.img_bytes = None
+        self.translations = None  # (detected language, original text, translated text) per region
+        self.windows = []  # Overlays, created on the GUI thread once the regions are captured
+        self.error = None
+        self.interactive = interactive  # False for IPC requests, which report errors to the client instead of a dialog
+        self.done = threading.Event()  # Set once the job has left the last worker stage
+
+class TranslationPipeline(QtCore.QObject):
+    job_captured = QtCore.pyqtSignal(object)  # Safe to show overlays now, they won't end up in the capture
+    job_finished = QtCore.pyqtSignal(object)  # Ready to render, delivered on the GUI thread
+    job_provisional = QtCore.pyqtSignal(object, int, object)  # Job, region index and offline translation shown until the API answers
+
+    def __init__(self, load_api_key, parent=None):
+        super().__init__(parent)
+        self.load_api_key = load_api_key
+        self.local = threading.local()
+        self.offline_executor = concurrent.futures.ThreadPoolExecutor(OFFLINE_WORKERS, thread_name_prefix="pipeline-offline")
+        self.online_executor = concurrent.futures.ThreadPoolExecutor(PIPELINE_WORKERS["translate"], thread_name_prefix="pipeline-online")
+        stages = [
+            ("capture", self.capture),
+            ("preprocess", self.preprocess),
+            ("encode", self.encode),
+            ("translate", self.translate),
+        ]
+        self.queues = [queue.Queue(maxsize=PIPELINE_QUEUE_SIZE) for _ in stages]
+        for i, (name, work) in enumerate(stages):
+            outbox = self.queues[i + 1] if i + 1 < len(stages) else None
+            for n in range(PIPELINE_WORKERS[name]):
+                thread = threading.Thread(target=self.run_stage, args=(name, work, self.queues[i], outbox),
+                                          name=f"pipeline-{name}-{n}", daemon=True)
+                thread.start()
+
+    def submit(self, job, timeout=None):
+        # Never blocks the GUI thread by default, returns False when the pipeline stays saturated
+        try:
+            self.queues[0].put(job, timeout is not None, timeout)
+            STATS.increment('jobs_submitted')
+            return True
+        except queue.Full:
+            logging.warning("Capture pipeline is full, dropping capture.")
+            STATS.increment('jobs_rejected')
+            return False
+
+    def run_stage(self, name, work, inbox, outbox):
+        while True:
+            job = inbox.get()
+            if job.error is None:
+                start = time.perf_counter()
+                try:
+                    if PROFILER.active:
+                        PROFILER.run(work, job)
+                    else:
+                        work(job)
+                except Exception as e:
+                    logging.exception(f"Pipeline stage '{name}' failed.")
+                    job.error = str(e)
+                STATS.record_stage(name, time.perf_counter() - start)
+            if outbox is not None:
+                outbox.put(job)  # Blocks while the next stage is backed up
+            else:
+                STATS.increment('jobs_failed' if job.error is not None else 'jobs_completed')
+                job.done.set()
+                self.job_finished.emit(job)
+
+    def capture(self, job):
+        if job.images is None and job.frame is not None:
+            job.images = [job.frame.crop(monitor) for monitor in job.monitors]
+        elif job.images is None:
+            # mss handles can't be shared between threads, each capture worker keeps its own
+            if not hasattr(self.local, 'sct'):
+                self.local.sct = mss.mss()
+            job.images = []
+            for monitor in job.monitors:
+                logging.info(f"Capturing screen: {monitor}")
+                screenshot = self.local.sct.grab(monitor)
+                # Convert the screenshot to a PIL Image with correct size and mode
+                job.images.append(Image.frombytes("RGB", (screenshot.width, screenshot.height), screenshot.rgb))
+            logging.info("Screenshot captured successfully.")
+        job.frame = None
+        self.job_captured.emit(job)
+
+    def preprocess(self, job):
+        if job.speculation is not None:
+            # Pick up whatever the speculation already produced. Both crop the same frame, so an exact
+            # match has the very same PNG; an overlapping one still shows the same text, so the same script.
+            speculation, job.speculation = job.speculation, None
+            speculation.done.wait()
+            exact = speculation.monitor == job.monitors[0]
+            if exact and speculation.img_bytes is not None:
+                job.img_bytes = [speculation.img_bytes]
+            if speculation.detect_language and (exact or speculation.script is not None):
+                job.scripts = [speculation.script]
+
+        # Cheap local script pre-detection, only needed when the user hasn't picked a language
+        if job.scripts is None:
+            if job.target_language == "Autodetect":
+                job.scripts = [detect_script(img) for img in job.images]
+            else:
+                job.scripts = [None] * len(job.images)
+
+    def encode(self, job):
+        if job.img_bytes is None:
+            job.img_bytes = [encode_image(img) for img in job.images]
+            logging.info("Image successfully converted to bytes.")
+        # The PNG is all we need from here on
+        job.images = None
+
+    def translate(self, job):
+        # Regions already translated (same pixels, same language) come from the shared cache
+        job.translations = [TRANSLATION_CACHE.get(img_bytes, job.target_language) for img_bytes in job.img_bytes]
+        pending = [i for i, translation in enumerate(job.translations) if translation is None]
+        if not pending:
+            logging.info("Translation served from cache.")
+            return
+
+        api_key = self.load_api_key()
+        has_key = api_key or not ENDPOINT_POOL.needs_default_key()
+        if len(pending) == 1 and OFFLINE_FALLBACK:
+            i = pending[0]
+            translation, online = self.race(job, i, api_key if has_key else None)
+            translations = [translation]
+        elif not has_key:
+            logging.error("No API key provided")
+            translations = [("No API key provided", "No API key provided", "No API key provided")] * len(pending)
+            online = False
+        elif len(pending) == 1:
+            i = pending[0]
+            translations = [translate_image(job.img_bytes[i], api_key, job.target_language, job.scripts[i])]
+            online = True
         else:
-            logging.error("Translation failed.")
-            QtCore.QMetaObject.invokeMethod(
-                self.app_instance,
-                "show_error",
-                QtCore.Qt.QueuedConnection
-            )
+            translations = translate_images([job.img_bytes[i] for i in pending], api_key, job.target_language,
+                                            [job.scripts[i] for i in pending])
+            online = True
+
+        for i, translation in zip(pending, translations):
+            job.translations[i] = translation
+            # Offline results aren't cached, the next capture of the same pixels should try the API again
+            if online and not is_failed_translation(translation):
+                TRANSLATION_CACHE.put(job.img_bytes[i], job.target_language, translation)
+
+    def race(self, job, index, api_key):
+        # Runs the offline backend and the API side by side under LATENCY_BUDGET_MS for region index of job.
+        # Returns (translation, came_from_api).
+        img_bytes, script = job.img_bytes[index], job.scripts[index]
+        offline = self.offline_executor.submit(self.profiled, translate_image_locally, img_bytes, job.target_language, script)
+        if api_key is None:
+            logging.error("No API key provided, using the offline backend only.")
+            return self.offline_result(offline.result()) or ("No API key provided", "No API key provided", "No API key provided"), False
+        online = self.online_executor.submit(self.profiled, translate_image, img_bytes, api_key, job.target_language, script)
+
+        try:
+            translation = online.result(timeout=LATENCY_BUDGET_MS / 1000)
+            if not is_failed_translation(translation):
+                offline.cancel()
+                return translation, True
+        except concurrent.futures.TimeoutError:
+            logging.info(f"API slower than {LATENCY_BUDGET_MS} ms, racing the offline backend.")
+
+        # Over budget: show the offline result if it finishes before the API does
+        if not online.done():
+            concurrent.futures.wait([online, offline], return_when=concurrent.futures.FIRST_COMPLETED)
+            if not online.done():
+                provisional = self.offline_result(offline.result())
+                if provisional is not None:
+                    STATS.increment('provisional_offline_results')
+                    self.job_provisional.emit(job, index, provisional)
+                concurrent.futures.wait([online])
+
+        translation = online.result()
+        if not is_failed_translation(translation):
+            return translation, True
+
+        # The API failed, keep the offline result
+        fallback = self.offline_result(offline.result())
+        if fallback is None:
+            return translation, True
+        logging.warning("API failed, keeping the offline translation.")
+        STATS.increment('offline_fallbacks')
+        return fallback, False
+
+    def profiled(self, work, *args):
+        # The race runs on executor threads, which need their own profile just like the stage workers
+        if PROFILER.active:
+            return PROFILER.run(work, *args)
+        return work(*args)
+
+    def offline_result(self, translation):
+        if translation is None:
+            return None
+        detected_language, original_text, translated_text = translation
+        return f"{detected_language} (offline)", original_text, translated_text
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    # One JSON request per line, one JSON response per line, until the client disconnects
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                if not secrets.compare_digest(str(request.get('token', '')), self.server.token):
+                    response = {"ok": False, "error": "Invalid token"}
+                else:
+                    response = self.server.dispatch(request)
+            except Exception as e:
+                logging.exception("Daemon request failed.")
+                response = {"ok": False, "error": str(e)}
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+class DaemonServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = os.name != 'nt'  # On Windows this would let another process bind the same port
+
+    def __init__(self, app, host=DAEMON_HOST, port=DAEMON_PORT):
+        super().__init__((host, port), DaemonRequestHandler)
+        self.app = app
+        # Clients must present this token, read from DAEMON_INFO_FILE, so other users can't drive the daemon
+        self.token = secrets.token_hex(16)
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="daemon-server", daemon=True).start()
+        fd = os.open(DAEMON_INFO_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({"host": self.server_address[0], "port": self.server_address[1], "token": self.token, "pid": os.getpid()}, f)
+        logging.info(f"Daemon listening on {self.server_address[0]}:{self.server_address[1]}")
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if os.path.exists(DAEMON_INFO_FILE):
+            os.remove(DAEMON_INFO_FILE)
+        logging.info("Daemon stopped.")
+
+    def dispatch(self, request):
+        command = request.get('command')
+        target_language = request.get('language') or self.app.target_language
+        if target_language != "Autodetect" and target_language not in LANGUAGE_CODES:
+            return {"ok": False, "error": f"Unknown language: {target_language}"}
+
+        if command == 'stats':
+            return {"ok": True, "stats": STATS.snapshot()}
+        if command == 'translate':
+            if 'path' in request:
+                with open(request['path'], 'rb') as f:
+                    data = f.read()
+            elif 'image' in request:
+                data = base64.b64decode(request['image'])
+            else:
+                return {"ok": False, "error": "translate needs 'path' or 'image'"}
+            img = Image.open(io.BytesIO(data))
+            job = CaptureJob([], target_language, images=[img if img.format == 'PNG' else img.convert('RGB')], interactive=False)
+            if img.format == 'PNG':
+                job.img_bytes = [data]  # Already what we'd send, skip re-encoding
+            return self.run_job(job)
+        if command == 'capture':
+            left, top, width, height = request['rect']
+            rect = QtCore.QRect(left, top, width, height)
+            overlays = [rect] if request.get('overlay', True) else []
+            return self.run_job(CaptureJob([selection_monitor(rect)], target_language, overlays, interactive=False))
+        return {"ok": False, "error": f"Unknown command: {command}"}
+
+    def run_job(self, job):
+        # One deadline for queueing and translating, so the client never waits longer than DAEMON_REQUEST_TIMEOUT
+        start = time.perf_counter()
+        deadline = start + DAEMON_REQUEST_TIMEOUT
+        if not self.app.pipeline.submit(job, timeout=DAEMON_REQUEST_TIMEOUT):
+            return {"ok": False, "error": "Pipeline is busy"}
+        if not job.done.wait(max(deadline - time.perf_counter(), 0)):
+            return {"ok": False, "error": "Timed out waiting for the translation"}
+        if job.error is not None:
+            return {"ok": False, "error": job.error}
+        return {
+            "ok": True,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+            "results": [{
+                "detected_language": detected_language,
+                "original_text": original_text,
+                "english_translation": translated_text,
+            } for detected_language, original_text, translated_text in job.translations],
+        }
 
 class TranslatorApp(QtWidgets.QWidget):
-    translation_ready = QtCore.pyqtSignal(str, str, str)  # Emits detected language, original text, and translated text
+    profiling_written = QtCore.pyqtSignal(object)  # Report directory, or None if writing failed
+    screen_grabbed = QtCore.pyqtSignal(object)  # ScreenFrame for the next selection, or None if grabbing failed
 
     def __init__(self):
         super().__init__()
         self.translation_windows = []
         self.target_language = "Autodetect"
+        self.batch_mode = False
         self.init_ui()
-        self.translation_ready.connect(self.update_translation_display)
+        self.pipeline = TranslationPipeline(self.load_api_key, self)
+        self.pipeline.job_captured.connect(self.show_job_overlays)
+        self.pipeline.job_finished.connect(self.render_job)
+        self.pipeline.job_provisional.connect(self.render_provisional)
+        self.profiling_written.connect(self.on_profiling_written)
+        self.screen_grabbed.connect(self.open_selection_window)
+        self.grabbing = False  # A ScreenGrabTask is running for the next selection window
         self.init_hotkey()
+        ENDPOINT_POOL.start_health_checks()
         self.selection_window = None  # Initialize selection_window attribute
+        self.speculation = None  # Latest SpeculativeCapture for the current selection session
+        self.screen_frame = None  # Clean ScreenFrame for the current selection session
         self.target_language = "Autodetect"
 
     def init_ui(self):
@@ -462,9 +1900,31 @@ class TranslatorApp(QtWidgets.QWidget):
         target_language_layout.addWidget(self.target_language_combo)
         options_page_layout.addLayout(target_language_layout)
 
+        # Batch mode: select several areas, translate them in one request
+        self.batch_mode_checkbox = QtWidgets.QCheckBox("Select multiple areas per capture (Enter to translate)")
+        self.batch_mode_checkbox.setChecked(self.batch_mode)
+        self.batch_mode_checkbox.toggled.connect(self.update_batch_mode)
+        options_page_layout.addWidget(self.batch_mode_checkbox)
+
         # Add a stretch to push the back button to the bottom
         options_page_layout.addStretch(1)
 
+        # Debug: profile a few captures to diagnose slowdowns or memory growth
+        self.profiling_button = QtWidgets.QPushButton('Start Profiling (Ctrl+Alt+P)', self)
+        self.profiling_button.setStyleSheet("""
+            QPushButton {
+                padding: 5px 10px;
+                font-size: 12px;
+                background-color: #f0f0f0;
+                color: #333;
+            }
+            QPushButton:hover {
+                background-color: #e0e0e0;
+            }
+        """)
+        self.profiling_button.clicked.connect(self.toggle_profiling)
+        options_page_layout.addWidget(self.profiling_button)
+
         # Back Button
         self.back_button = QtWidgets.QPushButton('Back', self)
         self.back_button.setStyleSheet("""
@@ -513,9 +1973,30 @@ class TranslatorApp(QtWidgets.QWidget):
         try:
             keyboard.add_hotkey('ctrl+alt+space', self.hotkey_triggered)
             logging.info("Hotkey (Ctrl+Alt+Space) registered successfully.")
+            keyboard.add_hotkey('ctrl+alt+p', lambda: QTimer.singleShot(0, self.toggle_profiling))
         except Exception as e:
             logging.error(f"Failed to register hotkey: {e}")
 
+    def toggle_profiling(self):
+        if PROFILER.is_writing():
+            return
+        if PROFILER.active:
+            # Reports are written in the background, the signal brings the result back to the GUI thread
+            PROFILER.stop(self.profiling_written.emit)
+            self.profiling_button.setText('Writing Profiling Reports...')
+            self.profiling_button.setEnabled(False)
+        else:
+            PROFILER.start()
+            self.profiling_button.setText('Stop Profiling (Ctrl+Alt+P)')
+
+    def on_profiling_written(self, output_dir):
+        self.profiling_button.setText('Start Profiling (Ctrl+Alt+P)')
+        self.profiling_button.setEnabled(True)
+        if output_dir is None:
+            QtWidgets.QMessageBox.warning(self, "Profiling", "Profiling reports could not be written, see the log for details.")
+        else:
+            QtWidgets.QMessageBox.information(self, "Profiling", f"Profiling reports written to:\n{os.path.abspath(output_dir)}")
+
     def hotkey_triggered(self):
         logging.info("Hotkey triggered. Initiating screenshot capture.")
         # Use QTimer to call capture_screenshot from the main thread
@@ -524,19 +2005,67 @@ class TranslatorApp(QtWidgets.QWidget):
     def capture_screenshot(self):
         try:
             logging.info("Starting screenshot capture.")
-            
-            if self.selection_window is None:
-                self.selection_window = SelectionWindow()
-                self.selection_window.selection_made.connect(self.on_selection_made)
-                self.selection_window.selection_cancelled.connect(self.on_selection_cancelled)  # New connection
-            
+
+            if self.selection_window is not None:
+                self.selection_window.show()
+                self.selection_window.activateWindow()  # Ensure the selection window is in focus
+            elif not self.grabbing:
+                # Freeze the screen first, the selection window opens once the frame is in
+                self.grabbing = True
+                QtCore.QThreadPool.globalInstance().start(ScreenGrabTask(self.screen_grabbed))
+        except Exception as e:
+            logging.exception("Failed to initiate screenshot capture.")
+
+    def open_selection_window(self, frame):
+        self.grabbing = False
+        try:
+            self.screen_frame = frame
+            self.selection_window = SelectionWindow(self.batch_mode, frame)
+            self.selection_window.selection_made.connect(self.on_selection_made)
+            self.selection_window.selections_made.connect(self.on_selections_made)
+            self.selection_window.selection_cancelled.connect(self.on_selection_cancelled)  # New connection
+            self.selection_window.selection_paused.connect(self.on_selection_paused)
+
             self.selection_window.show()
             self.selection_window.activateWindow()  # Ensure the selection window is in focus
         except Exception as e:
             logging.exception("Failed to initiate screenshot capture.")
 
+    def on_selection_paused(self, rect):
+        if self.screen_frame is None:
+            return
+        monitor = selection_monitor(rect)
+        if self.speculation is not None:
+            if self.speculation.monitor == monitor:
+                return
+            self.speculation.cancelled = True
+
+        self.speculation = SpeculativeCapture(monitor, self.target_language == "Autodetect", self.screen_frame)
+        QtCore.QThreadPool.globalInstance().start(SpeculativeTask(self.speculation))
+
+    def take_speculation(self, monitor):
+        # Returns the speculation usable for the final selection, or None.
+        # An exact match reuses the encoded PNG and the script; a selection that contains the speculative
+        # one, or lies inside it, only reuses the detected script.
+        speculation, self.speculation = self.speculation, None
+        if speculation is None:
+            return None
+        if speculation.monitor == monitor:
+            logging.info("Reusing speculative capture.")
+            return speculation
+        speculation.cancelled = True
+        if speculation.detect_language and (monitor_contains(monitor, speculation.monitor) or
+                                            monitor_contains(speculation.monitor, monitor)):
+            logging.info("Reusing the speculative capture's script.")
+            return speculation
+        return None
+
     def on_selection_cancelled(self):
         logging.info("Screenshot selection cancelled by user.")
+        if self.speculation is not None:
+            self.speculation.cancelled = True
+            self.speculation = None
+        self.screen_frame = None
         if self.selection_window:
             self.selection_window.close()
             self.selection_window.deleteLater()
@@ -545,167 +2074,87 @@ class TranslatorApp(QtWidgets.QWidget):
     def on_selection_made(self, rect):
         try:
             logging.info(f"User selected rectangle: {rect}")
-            self.selected_rect = rect
-            # Use mss to capture the selected region
-            with mss.mss() as sct:
-                monitor = {
-                    "left": rect.left(),
-                    "top": rect.top(),
-                    "width": max(rect.width(), MINIMUM_WINDOW_WIDTH),
-                    "height": max(rect.height(), MINIMUM_WINDOW_HEIGHT)
-                }
-                logging.info(f"Capturing screen: {monitor}")
-                screenshot = sct.grab(monitor)
-
-                # Convert the screenshot to a PIL Image with correct size and mode
-                img = Image.frombytes("RGB", (screenshot.width, screenshot.height), screenshot.rgb)
-                logging.info("Screenshot captured successfully.")
-
-            # Show the main window before processing
-            self.show()
-            QtWidgets.QApplication.processEvents()  # Ensure UI updates
-
-            # Explicitly delete the selection window
-            if self.selection_window:
-                self.selection_window.close()
-                self.selection_window.deleteLater()
-                self.selection_window = None
+            monitor = selection_monitor(rect)
 
-            # Show the translation window with "Translating..." text immediately
-            self.translation_window = TranslationDisplayWindow("Translating...", self.selected_rect, MINIMUM_WINDOW_WIDTH, MINIMUM_WINDOW_HEIGHT)
-            self.translation_window.show()
-            self.translation_windows.append(self.translation_window)
-
-            # Now process the image and update the window with the actual translation
-            self.process_image(img)
+            # Reuse the work done while the drag was paused, if it overlaps this selection
+            speculation = self.take_speculation(monitor)
+            job = CaptureJob([monitor], self.target_language, [rect], speculation=speculation, frame=self.screen_frame)
+            self.submit_job(job)
         except Exception as e:
             logging.exception("Failed during screenshot processing.")
 
-    def process_image(self, pil_image):
-        logging.info("Processing captured image.")
-        # Convert PIL Image to bytes
-        img_byte_arr = io.BytesIO()
-        pil_image.save(img_byte_arr, format='PNG')
-        img_bytes = img_byte_arr.getvalue()
-        logging.info("Image successfully converted to bytes.")
-
-        # Create and start the translation task in a separate thread
-        translation_task = TranslationTask(img_bytes, self.translation_window, self)
-        QtCore.QThreadPool.globalInstance().start(translation_task)
+    def on_selections_made(self, rects):
+        try:
+            logging.info(f"User selected {len(rects)} rectangles: {rects}")
+            job = CaptureJob([selection_monitor(rect) for rect in rects], self.target_language, rects, frame=self.screen_frame)
+            self.submit_job(job)
+        except Exception as e:
+            logging.exception("Failed during batch screenshot processing.")
 
-    def perform_translation(self, image_bytes):
-        logging.info("Using online translation (OpenAI API).")
-        api_key = self.load_api_key()
-        if not api_key:
-            logging.error("No API key provided")
-            return "No API key provided", "No API key provided", "No API key provided"
-        for attempt in range(MAX_RETRIES):
-            detected_language, original_text, english_text = self.call_openai_api(image_bytes, api_key)
-            if not (detected_language.startswith("API") and original_text.startswith("API") and english_text.startswith("API")):
-                return detected_language, original_text, english_text
-            logging.warning(f"API call failed. Attempt {attempt + 1} of {MAX_RETRIES}")
-        logging.error("All API call attempts failed")
-        return "All API call attempts failed", "All API call attempts failed", "All API call attempts failed"
+    def submit_job(self, job):
+        # Explicitly delete the selection window, before the capture worker grabs the screen
+        closed_window = self.selection_window is not None
+        if self.selection_window:
+            self.selection_window.close()
+            self.selection_window.deleteLater()
+            self.selection_window = None
+        self.screen_frame = None
 
-    def call_openai_api(self, image_bytes, api_key):
-        try:
-            # Encode image to base64
-            base64_image = base64.b64encode(image_bytes).decode('utf-8')
-            image_data_url = f"data:image/png;base64,{base64_image}"
-            logging.info("Image successfully encoded to base64.")
-
-            # Prepare the messages with image and target language
-            target_language_prompt = f"The target language is {self.target_language}. " if self.target_language != "Autodetect" else ""
-            messages = [
-                {
-                    "type": "text",
-                    "text": f"""
-                    {target_language_prompt}Please extract any text from the image, detect its language, and translate it into English. 
-                    Provide your response in the following JSON format:
-                    {{
-                        "detected_language": "The detected language",
-                        "original_text": "The original text in the detected language",
-                        "english_translation": "The English translation"
-                    }}
-                    If there is no text in the image, or you are unable to translate it, 
-                    please respond with:
-                    {{
-                        "detected_language": "Unable to detect",
-                        "original_text": "-Unable to extract-",
-                        "english_translation": "-Unable to translate-"
-                    }}
-                    """
-                },
-                {
-                    "type": "image_url",
-                    "image_url": {
-                        "url": image_data_url
-                    }
-                }
-            ]
-
-            payload = {
-                "model": MODEL_NAME,
-                "messages": [
-                    {"role": "system", "content": "You are a helpful translation assistant."},
-                    {"role": "user", "content": messages}
-                ],
-                "max_tokens": 300
-            }
+        if closed_window and job.frame is None:
+            # The capture worker will grab the live screen, queue the job only once the window is gone
+            QTimer.singleShot(LIVE_CAPTURE_DELAY_MS, lambda: self.queue_job(job))
+        else:
+            self.queue_job(job)
 
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {api_key}"
-            }
+    def queue_job(self, job):
+        # Capture, preprocessing, encoding and translation all happen on the pipeline's worker threads
+        if not self.pipeline.submit(job):
+            self.show_error()
 
-            logging.info("Sending request to OpenAI API.")
-            response = requests.post(API_URL, headers=headers, json=payload)
-            if response.status_code == 200:
-                result = response.json()
-                
-                # Log the raw API response for debugging
-                logging.debug(f"Raw API response: {result}")
-                
-                try:
-                    # Extract the content from the API response
-                    content = result['choices'][0]['message']['content']
-                    
-                    # Remove Markdown code block formatting if present
-                    content = content.strip('`')
-                    if content.startswith('json\n'):
-                        content = content[5:]  # Remove 'json\n'
-                    
-                    # Parse the content as JSON
-                    translation_data = json.loads(content)
-                    logging.info("Received successful response from OpenAI API.")
-                    return (
-                        translation_data.get('detected_language', 'Unable to detect'),
-                        translation_data.get('original_text', '-Unable to extract-'),
-                        translation_data.get('english_translation', '-Unable to translate-')
-                    )
-                except json.JSONDecodeError as e:
-                    logging.error(f"Failed to parse API response as JSON: {e}")
-                    logging.error(f"Response content: {content}")
-                    return "API parsing error", "API parsing error", "API parsing error"
-                except KeyError as e:
-                    logging.error(f"Unexpected API response structure: {e}")
-                    logging.error(f"Response content: {result}")
-                    return "API structure error", "API structure error", "API structure error"
-            else:
-                logging.error(f"API Error: {response.status_code}, {response.text}")
-                return f"API error: {response.status_code}", f"API error: {response.status_code}", f"API error: {response.status_code}"
-        except Exception as e:
-            logging.exception("Exception occurred during API call.")
-            return f"API call error: {str(e)}", f"API call error: {str(e)}", f"API call error: {str(e)}"
+    def show_job_overlays(self, job):
+        # Show the main window and the translation windows with "Translating..." text as soon as the regions are captured
+        if job.interactive:
+            self.show()
+        for rect in job.rects:
+            window = TranslationDisplayWindow("Translating...", rect, MINIMUM_WINDOW_WIDTH, MINIMUM_WINDOW_HEIGHT)
+            window.show()
+            job.windows.append(window)
+        self.translation_windows.extend(job.windows)
+
+    def render_job(self, job):
+        if job.error is not None or not job.translations or not all(all(translation) for translation in job.translations):
+            logging.error("Translation failed.")
+            if job.interactive:
+                self.show_error()
+            return
+
+        logging.info("Translation successful.")
+        for window, (detected_language, original_text, translated_text) in zip(job.windows, job.translations):
+            self.update_translation_display(window, detected_language, original_text, translated_text)
+
+        if len(job.translations) > 1:
+            # Show every region together in the main window
+            languages = list(dict.fromkeys(translation[0] for translation in job.translations))
+            original = "\n\n".join(f"[{i + 1}] {translation[1]}" for i, translation in enumerate(job.translations))
+            translated = "\n\n".join(f"[{i + 1}] {translation[2]}" for i, translation in enumerate(job.translations))
+            self.update_translation_display(None, ", ".join(languages), original, translated)
+            logging.info(f"Batch translation of {len(job.translations)} regions finished.")
+
+    def render_provisional(self, job, index, translation):
+        # Offline result for one region while the API is still working on it, replaced by render_job
+        if index >= len(job.windows):
+            return
+        detected_language, original_text, translated_text = translation
+        self.update_translation_display(job.windows[index], f"{detected_language}, provisional", original_text, translated_text)
 
     @QtCore.pyqtSlot()
     def show_error(self):
         QtWidgets.QMessageBox.critical(self, "Error", "Failed to get translation.")
 
-    @QtCore.pyqtSlot(str, str, str)
-    def update_translation_display(self, detected_language, original_text, translated_text):
-        if self.translation_window:
-            self.translation_window.update_text(translated_text)
+    @QtCore.pyqtSlot(object, str, str, str)
+    def update_translation_display(self, translation_window, detected_language, original_text, translated_text):
+        if translation_window:
+            translation_window.update_text(translated_text)
         
         # Update the detected language label
         self.detected_label.setText(f"Detected Language: {detected_language}")
@@ -722,6 +2171,9 @@ class TranslatorApp(QtWidgets.QWidget):
     def update_target_language(self, language):
         self.target_language = language
 
+    def update_batch_mode(self, checked):
+        self.batch_mode = checked
+
 class TranslationDisplayWindow(QGraphicsView):
     def __init__(self, initial_text, rect, minimum_width, minimum_height):
         super().__init__()
@@ -878,11 +2330,19 @@ def main():
     app = QtWidgets.QApplication(sys.argv)
     app.setWindowIcon(QIcon('images/v-letter.svg'))
     translator = TranslatorApp()
-    translator.show()
-    
+
+    if '--daemon' in sys.argv:
+        # Resident mode: no main window until a capture needs it, and closing it doesn't quit
+        app.setQuitOnLastWindowClosed(False)
+        server = DaemonServer(translator)
+        server.start()
+        app.aboutToQuit.connect(server.stop)
+    else:
+        translator.show()
+
     # Keep the application running in the background with the below. Works even if you close the window. Not sure why you'd want this but here it is.
     # app.setQuitOnLastWindowClosed(False)
-    
+
     sys.exit(app.exec_())
 
 if __name__ == '__main__':
@@ -0,0 +1,77 @@
+import os
+import sys
+import json
+import socket
+import argparse
+
+# Tiny client for a Vistran instance started with `python main.py --daemon`.
+# Deliberately stdlib only, so asking the warm daemon for a translation doesn't pay for Qt or PIL imports.
+
+DAEMON_INFO_FILE = os.path.join(os.path.expanduser('~'), '.vistran_daemon.json')
+TIMEOUT = 130  # Slightly above DAEMON_REQUEST_TIMEOUT in main.py, so the daemon reports its own timeouts first
+
+
+def send(request):
+    try:
+        with open(DAEMON_INFO_FILE, encoding='utf-8') as f:
+            info = json.load(f)
+    except FileNotFoundError:
+        sys.exit("Vistran daemon is not running (start it with: python main.py --daemon)")
+
+    request['token'] = info['token']
+    try:
+        with socket.create_connection((info['host'], info['port']), timeout=TIMEOUT) as sock:
+            sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+            with sock.makefile('rb') as f:
+                return json.loads(f.readline())
+    except socket.timeout:
+        sys.exit(f"Vistran daemon did not answer within {TIMEOUT} seconds")
+    except ConnectionRefusedError:
+        sys.exit("Vistran daemon is not running (start it with: python main.py --daemon)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ask a running Vistran daemon to translate something")
+    parser.add_argument('--json', action='store_true', help="Print the raw JSON response")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    translate = subparsers.add_parser('translate', help="Translate an image file")
+    translate.add_argument('path')
+    translate.add_argument('--language', help="Language of the text, default is the daemon's setting")
+
+    capture = subparsers.add_parser('capture', help="Capture and translate a screen rectangle")
+    capture.add_argument('left', type=int)
+    capture.add_argument('top', type=int)
+    capture.add_argument('width', type=int)
+    capture.add_argument('height', type=int)
+    capture.add_argument('--language', help="Language of the text, default is the daemon's setting")
+    capture.add_argument('--no-overlay', action='store_true', help="Don't show the translation overlay on screen")
+
+    subparsers.add_parser('stats', help="Show pipeline, cache and endpoint statistics")
+
+    args = parser.parse_args()
+    if args.command == 'translate':
+        request = {"command": "translate", "path": os.path.abspath(args.path), "language": args.language}
+    elif args.command == 'capture':
+        request = {"command": "capture", "rect": [args.left, args.top, args.width, args.height],
+                   "language": args.language, "overlay": not args.no_overlay}
+    else:
+        request = {"command": "stats"}
+
+    response = send(request)
+    if args.json or args.command == 'stats':
+        print(json.dumps(response, indent=2, ensure_ascii=False))
+    elif not response.get('ok'):
+        sys.exit(f"Error: {response.get('error')}")
+    else:
+        for result in response['results']:
+            print(f"Detected Language: {result['detected_language']}")
+            print(result['original_text'])
+            print()
+            print(result['english_translation'])
+    if not response.get('ok'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()